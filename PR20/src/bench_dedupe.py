@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Замер поиска дубликатов справочника меломана на синтетическом каталоге.
+
+Названия собираются из небольшого набора слогов, поэтому биграммы у них
+часто общие; около 2% записей — копии недавних с другим регистром
+исполнителя.
+
+Запуск: python bench_dedupe.py --n 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List
+
+from spravochnik_melomana import MusicEntry, find_duplicates
+
+SYLLABLES = ["ка", "ро", "ми", "ла", "то", "ве", "ну", "зо", "ры", "ше", "ба", "ди"]
+
+
+def make_entries(n: int, seed: int = 3) -> List[MusicEntry]:
+    rnd = random.Random(seed)
+
+    def word() -> str:
+        return "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+
+    artists = [word().title() + " " + word().title() for _ in range(max(1, n // 20))]
+    entries: List[MusicEntry] = []
+    for i in range(1, n + 1):
+        artist, album, year = rnd.choice(artists), word().title() + " " + word(), rnd.randint(1960, 2024)
+        if entries and rnd.random() < 0.02:
+            source = rnd.choice(entries[-1000:])
+            artist, album, year = source.artist.upper(), source.album, source.year
+        entries.append(MusicEntry(i, artist, album, "Рок", year))
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер поиска дубликатов.")
+    parser.add_argument("--n", type=int, default=1_000_000, help="число записей")
+    args = parser.parse_args()
+
+    entries = make_entries(args.n)
+    t0 = time.perf_counter()
+    groups = find_duplicates(entries)
+    seconds = time.perf_counter() - t0
+    print(f"Записей: {args.n}, групп: {len(groups)}, "
+          f"лишних записей: {sum(len(g.duplicates) for g in groups)}, время: {seconds:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Замер памяти справочника меломана на синтетическом каталоге.
+
+Сравниваются три представления одних и тех же записей:
+  - прежний dataclass с __dict__ у каждого экземпляра, строки не интернированы;
+  - MusicEntry со slots и интернированными исполнителем и жанром;
+  - колоночный ColumnarCatalog.
+
+Запуск: python bench_memory.py --n 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Tuple
+
+from spravochnik_melomana import ColumnarCatalog, MusicEntry
+
+GENRES = ["Рок", "Джаз", "Поп", "Классика", "Хип-хоп", "Электроника", "Блюз", "Метал"]
+
+Row = Tuple[int, str, str, str, int, Optional[int], str, str]
+
+
+@dataclass
+class LegacyEntry:
+    id: int
+    artist: str
+    album: str
+    genre: str
+    year: int
+    rating: Optional[int] = None
+    notes: str = ""
+    created_at: str = ""
+
+
+def rows(n: int, seed: int = 1) -> Iterator[Row]:
+    # Строки собираются заново для каждой записи — как после json.load.
+    rnd = random.Random(seed)
+    artists = max(1, n // 20)
+    for i in range(1, n + 1):
+        rating = rnd.randint(1, 10) if rnd.random() < 0.8 else None
+        yield (i, "Исполнитель %d" % rnd.randrange(artists), "Альбом %d" % i,
+               "".join(rnd.choice(GENRES)), rnd.randint(1950, 2024), rating, "",
+               "2024-01-01 12:00:%02d" % (i % 60))
+
+
+def build_legacy(n: int) -> list:
+    return [LegacyEntry(*r) for r in rows(n)]
+
+
+def build_slotted(n: int) -> list:
+    return [MusicEntry.from_dict(dict(zip(MusicEntry.__dataclass_fields__, r))) for r in rows(n)]
+
+
+def build_columnar(n: int) -> ColumnarCatalog:
+    catalog = ColumnarCatalog()
+    for r in rows(n):
+        catalog.append(MusicEntry(*r))
+    return catalog
+
+
+def measure(build: Callable[[int], object], n: int) -> Tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    data = build(n)
+    seconds = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return size / (1 << 20), seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер памяти представлений каталога.")
+    parser.add_argument("--n", type=int, default=1_000_000, help="число записей")
+    args = parser.parse_args()
+
+    print(f"Записей: {args.n}")
+    print(f"{'Представление':<24}{'МиБ':>10}{'байт/запись':>14}{'сборка, с':>12}")
+    for name, build in (("dataclass + __dict__", build_legacy),
+                        ("slots + intern", build_slotted),
+                        ("колоночное", build_columnar)):
+        mib, seconds = measure(build, args.n)
+        print(f"{name:<24}{mib:>10.1f}{mib * (1 << 20) / args.n:>14.0f}{seconds:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
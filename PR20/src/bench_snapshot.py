@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Замер сохранения и загрузки снимка справочника меломана.
+
+Для каждого размера каталога сравниваются прежний вид файла
+(словарь на запись, asdict, indent=2) и форматы write_snapshot/read_snapshot,
+доступные в окружении (json, orjson, msgpack).
+
+Запуск: python bench_snapshot.py --sizes 10000 100000 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Callable, List, Tuple
+
+from spravochnik_melomana import MusicEntry, read_snapshot, snapshot_formats, write_snapshot
+
+GENRES = ["Рок", "Джаз", "Поп", "Классика", "Хип-хоп", "Электроника", "Блюз", "Метал"]
+
+
+def make_entries(n: int, seed: int = 1) -> List[MusicEntry]:
+    rnd = random.Random(seed)
+    artists = max(1, n // 20)
+    return [
+        MusicEntry(i, "Исполнитель %d" % rnd.randrange(artists), "Альбом %d" % i, rnd.choice(GENRES),
+                   rnd.randint(1950, 2024), rnd.randint(1, 10) if rnd.random() < 0.8 else None,
+                   "", "2024-01-01 12:00:00")
+        for i in range(1, n + 1)
+    ]
+
+
+def save_legacy(path: str, entries: List[MusicEntry]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"entries": [asdict(e) for e in entries]}, f, ensure_ascii=False, indent=2)
+
+
+def load_legacy(path: str) -> List[MusicEntry]:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return [MusicEntry.from_dict(d) for d in raw.get("entries", [])]
+
+
+def timed(fn: Callable[[], object]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def bench(path: str, entries: List[MusicEntry]) -> List[Tuple[str, float, float, int]]:
+    results = []
+    save = timed(lambda: save_legacy(path, entries))
+    load = timed(lambda: load_legacy(path))
+    results.append(("json (прежний)", save, load, os.path.getsize(path)))
+    for fmt in snapshot_formats():
+        save = timed(lambda: write_snapshot(path, entries, fmt))
+        load = timed(lambda: read_snapshot(path))
+        results.append((fmt, save, load, os.path.getsize(path)))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер сохранения/загрузки снимка каталога.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="размеры каталога")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot")
+        for n in args.sizes:
+            entries = make_entries(n)
+            print(f"\nЗаписей: {n}")
+            print(f"{'Формат':<18}{'сохранение, с':>15}{'загрузка, с':>14}{'размер, МиБ':>14}")
+            for name, save, load, size in bench(path, entries):
+                print(f"{name:<18}{save:>15.3f}{load:>14.3f}{size / (1 << 20):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,25 +12,73 @@
   - поиск/фильтрация/сортировка
   - оценка и рекомендации "Что послушать?"
   - статистика по жанрам и годам
-  - автосохранение/загрузка (JSON), импорт/экспорт CSV
+  - автосохранение/загрузка (JSON, по желанию orjson/msgpack), импорт/экспорт CSV
+  - хранение в SQLite (WAL, FTS5) и перенос в него данных из JSON
+  - поиск и слияние дубликатов (транслит, нечёткое сравнение)
   - валидация полей и красивое табличное отображение
 """
 from __future__ import annotations
 
 import csv
+import gc
 import json
+import argparse
+import math
 import os
+import re
+import sqlite3
 import sys
-from dataclasses import dataclass, asdict, field
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Optional
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # без orjson снимки читаются и пишутся модулем json
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # без msgpack двоичный формат снимка недоступен
+    msgpack = None
 
 DATA_FILE = "melomaniac_data.json"
+JOURNAL_SUFFIX = ".journal"
+COMPACT_EVERY = 1000  # после стольких операций журнал сворачивается в снимок
+IMPORT_BATCH = 10000
+PAGE_SIZE = 20
+WIDTH_SAMPLE = 200  # ширина колонок считается по первым строкам, а не по всей выборке
+MAX_CELL_WIDTH = 30
+TEXT_INDEX_SUFFIX = ".trigrams.json"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FORMATS = ("json", "orjson", "msgpack")
+SNAPSHOT_CODECS = {"orjson": orjson, "msgpack": msgpack}
+SNAPSHOT_FIELDS = ["id", "artist", "album", "genre", "year", "rating", "notes", "created_at"]
 
 # --------------------------- Модель ---------------------------
 
-@dataclass
+_stamp_cache = [0, ""]
+
+
+def now_stamp() -> str:
+    """Текущее время строкой; форматируется не чаще раза в секунду."""
+    now = int(time.time())
+    if now != _stamp_cache[0]:
+        _stamp_cache[0] = now
+        _stamp_cache[1] = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+    return _stamp_cache[1]
+
+
+@dataclass(slots=True)
 class MusicEntry:
+    # slots — без __dict__ у каждого экземпляра; исполнитель и жанр
+    # интернируются, так что повторяющиеся строки хранятся в одном экземпляре.
     id: int
     artist: str
     album: str
@@ -38,73 +86,511 @@ class MusicEntry:
     year: int
     rating: Optional[int] = None  # 1..10
     notes: str = ""
-    created_at: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    created_at: str = field(default_factory=now_stamp)
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Поля скалярные, поэтому asdict с его глубоким копированием не нужен.
+        return {
+            "id": self.id,
+            "artist": self.artist,
+            "album": self.album,
+            "genre": self.genre,
+            "year": self.year,
+            "rating": self.rating,
+            "notes": self.notes,
+            "created_at": self.created_at,
+        }
 
     @staticmethod
     def from_dict(d: Dict) -> "MusicEntry":
         return MusicEntry(
             id=int(d["id"]),
-            artist=str(d["artist"]),
+            artist=sys.intern(str(d["artist"])),
             album=str(d["album"]),
-            genre=str(d["genre"]),
+            genre=sys.intern(str(d["genre"])),
             year=int(d["year"]),
             rating=None if d.get("rating") in (None, "", "None") else int(d["rating"]),
             notes=str(d.get("notes", "")),
-            created_at=str(d.get("created_at", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))),
+            created_at=str(d.get("created_at") or now_stamp()),
+        )
+
+    def to_row(self) -> Tuple:
+        return (self.id, self.artist, self.album, self.genre, self.year, self.rating, self.notes, self.created_at)
+
+    @staticmethod
+    def from_row(row) -> "MusicEntry":
+        # Строка снимка уже прошла проверку при записи — без преобразований типов.
+        entry_id, artist, album, genre, year, rating, notes, created_at = row
+        return MusicEntry(entry_id, sys.intern(artist), album, sys.intern(genre), year, rating, notes, created_at)
+
+
+class StringColumn:
+    """Колонка строк со словарным кодированием: коды — в array, строки — в таблице."""
+
+    def __init__(self) -> None:
+        self.codes = array("I")
+        self.table: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def append(self, value: str) -> None:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.table)
+            self.table.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, row: int) -> str:
+        return self.table[self.codes[row]]
+
+
+class ColumnarCatalog:
+    """Компактное колоночное хранение каталога для больших объёмов.
+
+    id, год и оценка лежат в массивах array, текстовые поля — в StringColumn.
+    Записи добавляются по возрастанию id (поиск по id — бинарный), удаление
+    лишь помечает строку. MusicEntry собирается только при обращении к строке.
+    """
+
+    TEXT_FIELDS = ("artist", "album", "genre", "notes", "created_at")
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.years = array("h")
+        self.ratings = array("b")  # 0 — без оценки
+        self.alive = bytearray()
+        self.text = {f: StringColumn() for f in self.TEXT_FIELDS}
+        self._deleted = 0
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[MusicEntry]) -> "ColumnarCatalog":
+        catalog = cls()
+        for e in sorted(entries, key=lambda e: e.id):
+            catalog.append(e)
+        return catalog
+
+    def append(self, e: MusicEntry) -> None:
+        if self.ids and e.id <= self.ids[-1]:
+            raise ValueError("Записи должны добавляться по возрастанию id.")
+        self.ids.append(e.id)
+        self.years.append(e.year)
+        self.ratings.append(e.rating or 0)
+        self.alive.append(1)
+        for f in self.TEXT_FIELDS:
+            self.text[f].append(getattr(e, f))
+
+    def _find(self, entry_id: int) -> Optional[int]:
+        row = bisect_left(self.ids, entry_id)
+        if row < len(self.ids) and self.ids[row] == entry_id and self.alive[row]:
+            return row
+        return None
+
+    def _entry(self, row: int) -> MusicEntry:
+        text = self.text
+        return MusicEntry(
+            self.ids[row], text["artist"][row], text["album"][row], text["genre"][row],
+            self.years[row], self.ratings[row] or None, text["notes"][row], text["created_at"][row],
         )
 
+    def get(self, entry_id: int) -> Optional[MusicEntry]:
+        row = self._find(entry_id)
+        return None if row is None else self._entry(row)
+
+    def delete(self, entry_id: int) -> bool:
+        row = self._find(entry_id)
+        if row is None:
+            return False
+        self.alive[row] = 0
+        self._deleted += 1
+        return True
+
+    def __len__(self) -> int:
+        return len(self.ids) - self._deleted
+
+    def __iter__(self) -> Iterator[MusicEntry]:
+        for row in range(len(self.ids)):
+            if self.alive[row]:
+                yield self._entry(row)
+
+
+@dataclass
+class ImportReport:
+    added: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    errors_path: Optional[str] = None
+
+    @property
+    def rows_per_sec(self) -> float:
+        total = self.added + self.duplicates + self.rejected
+        return total / self.seconds if self.seconds else float(total)
+
 
 # --------------------------- Хранилище ---------------------------
 
+class TrigramIndex:
+    """Инвертированный индекс триграмм по текстовым полям записи.
+
+    Подстрока длиной от трёх символов может встретиться только в записях,
+    содержащих все её триграммы, — их и нужно проверить.
+    """
+
+    FIELDS = ("artist", "album", "genre", "notes")
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Dict[str, Set[int]]] = {f: {} for f in self.FIELDS}
+
+    @staticmethod
+    def grams(text: str) -> Set[str]:
+        text = text.lower()
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, e: MusicEntry) -> None:
+        for f in self.FIELDS:
+            postings = self.postings[f]
+            for g in self.grams(getattr(e, f)):
+                postings.setdefault(g, set()).add(e.id)
+
+    def remove(self, e: MusicEntry) -> None:
+        for f in self.FIELDS:
+            postings = self.postings[f]
+            for g in self.grams(getattr(e, f)):
+                ids = postings.get(g)
+                if ids is not None:
+                    ids.discard(e.id)
+                    if not ids:
+                        del postings[g]
+
+    def candidates(self, field: str, needle: str) -> Optional[Set[int]]:
+        """Кандидаты на совпадение или None, если подстрока короче триграммы."""
+        grams = self.grams(needle)
+        if not grams:
+            return None
+        postings = self.postings[field]
+        sets = sorted((postings.get(g, set()) for g in grams), key=len)
+        result = set(sets[0])
+        for ids in sets[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def dump(self, path: str, stamp: List[int]) -> None:
+        payload = {
+            "stamp": stamp,
+            "postings": {f: {g: list(ids) for g, ids in p.items()} for f, p in self.postings.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def restore(cls, path: str, stamp: List[int]) -> Optional["TrigramIndex"]:
+        """Индекс с диска, если он построен по тому же снимку данных."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if raw.get("stamp") != stamp or set(raw.get("postings", {})) != set(cls.FIELDS):
+            return None
+        index = cls()
+        index.postings = {f: {g: set(ids) for g, ids in p.items()} for f, p in raw["postings"].items()}
+        return index
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Сборщик циклов выключен на время массового создания объектов.
+
+    Создаются только новые объекты без циклов, а его проходы по растущей
+    куче почти удваивают время загрузки и поиска дубликатов.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def snapshot_formats() -> Tuple[str, ...]:
+    """Форматы снимка, доступные в текущем окружении."""
+    return tuple(f for f in SNAPSHOT_FORMATS if f == "json" or SNAPSHOT_CODECS[f] is not None)
+
+
+def detect_snapshot_format(head: bytes) -> str:
+    """Формат снимка по первым байтам: JSON начинается с '{', msgpack — с заголовка словаря."""
+    head = head.lstrip()
+    if not head or head[:1] == b"{":
+        return "json"
+    if head[0] in range(0x80, 0x90) or head[0] in (0xDE, 0xDF):
+        return "msgpack"
+    raise ValueError("Неизвестный формат файла данных")
+
+
+def write_snapshot(path: str, entries: Iterable[MusicEntry], fmt: str = "json") -> None:
+    """Атомарная запись снимка: временный файл, fsync, затем замена.
+
+    Записи хранятся строками-кортежами в порядке SNAPSHOT_FIELDS — без имён
+    полей у каждой записи и без отступов.
+    """
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Неизвестный формат снимка: {fmt}")
+    payload = {"version": SNAPSHOT_VERSION, "fields": SNAPSHOT_FIELDS, "rows": [e.to_row() for e in entries]}
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise ValueError("Для формата msgpack нужен пакет msgpack")
+        data = msgpack.packb(payload, use_bin_type=True)
+    elif fmt == "orjson":
+        if orjson is None:
+            raise ValueError("Для формата orjson нужен пакет orjson")
+        data = orjson.dumps(payload)
+    else:
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Tuple[str, List[MusicEntry]]:
+    """Снимок с диска и его формат. Понимает и старый вид {"entries": [{...}]}.
+
+    JSON разбирается через orjson, если он установлен: файлы форматов
+    json и orjson совпадают.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    fmt = detect_snapshot_format(data[:16])
+    if fmt == "msgpack" and msgpack is None:
+        raise ValueError("Файл данных в формате msgpack, а пакет msgpack не установлен")
+    with gc_paused():
+        if fmt == "msgpack":
+            raw = msgpack.unpackb(data, raw=False)
+        elif orjson is not None:
+            raw = orjson.loads(data)
+        else:
+            raw = json.loads(data.decode("utf-8"))
+        if "rows" in raw:
+            if list(raw.get("fields", ())) != SNAPSHOT_FIELDS:
+                raise ValueError("Снимок записан с другим набором полей")
+            return fmt, [MusicEntry.from_row(r) for r in raw["rows"]]
+        return fmt, [MusicEntry.from_dict(d) for d in raw.get("entries", [])]
+
+
 class MusicDirectory:
-    def __init__(self, path: str = DATA_FILE):
+    def __init__(self, path: str = DATA_FILE, persist_index: bool = False, snapshot_format: Optional[str] = None):
         self.path = path
-        self.entries: List[MusicEntry] = []
+        self.snapshot_format = snapshot_format
+        # Основное хранилище — словарь id -> запись (сохраняет порядок добавления),
+        # плюс вторичные индексы жанр/год -> множество id.
+        self._by_id: Dict[int, MusicEntry] = {}
+        self._by_genre: Dict[str, Set[int]] = {}
+        self._by_year: Dict[int, Set[int]] = {}
+        # Счётчики для статистики, обновляются вместе с индексами.
+        self._by_decade: Dict[int, int] = {}
+        self._by_rating: Dict[Optional[int], int] = {}
+        self._genre_rating: Dict[str, List[int]] = {}  # жанр -> [сумма оценок, число оценённых]
+        # Триграммный индекс для поиска подстрок; при persist_index он
+        # сохраняется рядом с данными вместе со снимком.
+        self._text = TrigramIndex()
+        self.persist_index = persist_index
+        self.text_index_path = path + TEXT_INDEX_SUFFIX
+        # Отсортированные представления: имя ключа -> список ключей с id
+        # в конце. Строятся при первом запросе и дальше поддерживаются
+        # вставкой/удалением через bisect.
+        self._views: Dict[str, List[Tuple]] = {}
         self._next_id = 1
+        # Журнал изменений: операции копятся в _pending и дописываются
+        # в файл одним блоком в конце транзакции.
+        self.journal_path = path + JOURNAL_SUFFIX
+        self._pending: List[Dict] = []
+        self._journal_ops = 0
+        self._tx_depth = 0
+        self.load_error: Optional[Exception] = None  # последняя ошибка load(), если была
         self.load()
 
+    @property
+    def entries(self) -> List[MusicEntry]:
+        return list(self._by_id.values())
+
+    @entries.setter
+    def entries(self, entries: Iterable[MusicEntry]) -> None:
+        self._reset(entries)
+
+    def _reset(self, entries: Iterable[MusicEntry], text: Optional[TrigramIndex] = None) -> None:
+        self._by_id = {}
+        self._by_genre = {}
+        self._by_year = {}
+        self._by_decade = {}
+        self._by_rating = {}
+        self._genre_rating = {}
+        build_text = text is None
+        self._text = TrigramIndex() if build_text else text
+        self._views = {}
+        for e in entries:
+            self._by_id[e.id] = e
+            self._index_fields(e, text=build_text)
+
+    # --- Индексы ---
+    def _index(self, e: MusicEntry) -> None:
+        self._by_id[e.id] = e
+        self._index_fields(e)
+
+    def _unindex(self, e: MusicEntry) -> None:
+        del self._by_id[e.id]
+        self._unindex_fields(e)
+
+    def _index_fields(self, e: MusicEntry, text: bool = True) -> None:
+        self._by_genre.setdefault(e.genre, set()).add(e.id)
+        self._by_year.setdefault(e.year, set()).add(e.id)
+        self._count_stats(e, 1)
+        if text:
+            self._text.add(e)
+        for name, view in self._views.items():
+            insort(view, self._view_key(name, e))
+
+    def _unindex_fields(self, e: MusicEntry) -> None:
+        self._count_stats(e, -1)
+        self._text.remove(e)
+        for name, view in self._views.items():
+            key = self._view_key(name, e)
+            i = bisect_left(view, key)
+            if i < len(view) and view[i] == key:
+                del view[i]
+        for index, key in ((self._by_genre, e.genre), (self._by_year, e.year)):
+            ids = index[key]
+            ids.discard(e.id)
+            if not ids:
+                del index[key]
+
+    def _count_stats(self, e: MusicEntry, delta: int) -> None:
+        for counter, key in ((self._by_decade, e.year // 10 * 10), (self._by_rating, e.rating)):
+            counter[key] = counter.get(key, 0) + delta
+            if not counter[key]:
+                del counter[key]
+        if e.rating is not None:
+            acc = self._genre_rating.setdefault(e.genre, [0, 0])
+            acc[0] += delta * e.rating
+            acc[1] += delta
+            if not acc[1]:
+                del self._genre_rating[e.genre]
+
+    @staticmethod
+    def _view_key(name: str, e: MusicEntry) -> Tuple[Any, ...]:
+        if name == "recommend":
+            # Лучшая оценка, затем самый свежий, затем по исполнителю.
+            return (-(e.rating or 0), -e.year, e.artist.lower(), e.id)
+        value = getattr(e, name)
+        # id в конце делает ключ уникальным; None (нет оценки) — в конец списка.
+        return (0, value, e.id) if value is not None else (1, 0, e.id)
+
+    def _view(self, name: str) -> List[Tuple]:
+        view = self._views.get(name)
+        if view is None:
+            view = sorted(self._view_key(name, e) for e in self._by_id.values())
+            self._views[name] = view
+        return view
+
+    @staticmethod
+    def _walk(view: List[Tuple], reverse: bool) -> Iterator[Tuple]:
+        """Ключи представления по порядку. При reverse равные значения идут
+        по возрастанию id — как у устойчивой сортировки с reverse=True."""
+        if not reverse:
+            yield from view
+            return
+        end = len(view)
+        while end:
+            start = end - 1
+            value = view[start][:-1]
+            while start and view[start - 1][:-1] == value:
+                start -= 1
+            yield from view[start:end]
+            end = start
+
+    @staticmethod
+    def _lookup(index: Dict, needle: str) -> Set[int]:
+        """id записей, у которых ключ индекса содержит подстроку (без учёта регистра)."""
+        needle = needle.lower()
+        ids: Set[int] = set()
+        for key, key_ids in index.items():
+            if needle in str(key).lower():
+                ids |= key_ids
+        return ids
+
     # --- CRUD ---
     def add_entry(self, artist: str, album: str, genre: str, year: int, rating: Optional[int] = None, notes: str = "") -> MusicEntry:
         self._validate(artist, album, genre, year, rating)
-        entry = MusicEntry(id=self._next_id, artist=artist.strip(), album=album.strip(), genre=genre.strip(), year=int(year), rating=rating, notes=notes.strip())
-        self.entries.append(entry)
+        entry = MusicEntry(id=self._next_id, artist=sys.intern(artist.strip()), album=album.strip(), genre=sys.intern(genre.strip()), year=int(year), rating=rating, notes=notes.strip())
+        self._index(entry)
         self._next_id += 1
-        self.save()
+        self._log({"op": "add", "entry": entry.to_dict()})
         return entry
 
+    def iter_entries(self, sort_by: str = "id", reverse: bool = False, filter_by: Optional[Dict] = None) -> Iterator[MusicEntry]:
+        """То же, что list_entries, но без фильтров записи отдаются по одной
+        прямо из отсортированного представления."""
+        if sort_by not in MusicEntry.__dataclass_fields__:
+            sort_by = "id"
+        if any(v is not None and v != "" for v in (filter_by or {}).values()):
+            yield from self.list_entries(sort_by, reverse, filter_by)
+            return
+        for k in self._walk(self._view(sort_by), reverse):
+            yield self._by_id[k[-1]]
+
     def list_entries(self, sort_by: str = "id", reverse: bool = False, filter_by: Optional[Dict] = None) -> List[MusicEntry]:
-        data = self.entries[:]
+        if sort_by not in MusicEntry.__dataclass_fields__:
+            sort_by = "id"
+        filter_by = {k: v for k, v in (filter_by or {}).items() if v is not None and v != ""}
+        if not filter_by:
+            # Без фильтров порядок берётся из готового представления, без сортировки.
+            return [self._by_id[k[-1]] for k in self._walk(self._view(sort_by), reverse)]
+        # Жанр и год отбираются по индексам: просматриваются только ключи,
+        # а не все записи каталога.
+        candidates: Optional[Set[int]] = None
+        for k, index in (("genre", self._by_genre), ("year", self._by_year)):
+            if k in filter_by:
+                ids = self._lookup(index, str(filter_by.pop(k)))
+                candidates = ids if candidates is None else candidates & ids
+        # Остальные текстовые поля сужаются триграммным индексом, затем
+        # кандидаты проверяются обычным сравнением подстрок.
+        for k in ("artist", "album", "notes"):
+            if k in filter_by:
+                ids = self._text.candidates(k, str(filter_by[k]))
+                if ids is not None:
+                    candidates = ids if candidates is None else candidates & ids
+        if candidates is None:
+            data = self.entries
+        else:
+            data = [self._by_id[i] for i in sorted(candidates)]
         if filter_by:
+            needles = {k: str(v).lower() for k, v in filter_by.items()}
+
             def pred(e: MusicEntry) -> bool:
-                ok = True
-                for k, v in filter_by.items():
-                    if v is None or v == "":
-                        continue
+                for k, v in needles.items():
                     attr = getattr(e, k, None)
                     if attr is None:
-                        ok = False
-                        break
-                    if isinstance(attr, str):
-                        ok = ok and v.lower() in attr.lower()
-                    else:
-                        ok = ok and str(v).lower() in str(attr).lower()
-                return ok
+                        return False
+                    if v not in (attr.lower() if isinstance(attr, str) else str(attr).lower()):
+                        return False
+                return True
             data = [e for e in data if pred(e)]
-        if sort_by not in MusicEntry.__dataclass_fields__:
-            sort_by = "id"
-        data.sort(key=lambda x: getattr(x, sort_by), reverse=reverse)
+        # Без id в ключе: при равных значениях остаётся порядок добавления.
+        data.sort(key=lambda x: self._view_key(sort_by, x)[:-1], reverse=reverse)
         return data
 
     def delete_entry(self, entry_id: int) -> bool:
-        for i, e in enumerate(self.entries):
-            if e.id == entry_id:
-                del self.entries[i]
-                self.save()
-                return True
-        return False
+        e = self._by_id.get(entry_id)
+        if e is None:
+            return False
+        self._unindex(e)
+        self._log({"op": "delete", "id": entry_id})
+        return True
 
     def edit_entry(self, entry_id: int, **updates) -> bool:
         e = self.get(entry_id)
@@ -118,36 +604,138 @@ class MusicDirectory:
         rating = updates.get("rating", e.rating)
         notes = updates.get("notes", e.notes)
         self._validate(artist, album, genre, year, rating)
-        e.artist, e.album, e.genre, e.year, e.rating, e.notes = artist.strip(), album.strip(), genre.strip(), year, rating, notes.strip()
-        self.save()
+        self._unindex_fields(e)
+        e.artist, e.album, e.genre, e.year, e.rating, e.notes = sys.intern(artist.strip()), album.strip(), sys.intern(genre.strip()), year, rating, notes.strip()
+        self._index_fields(e)
+        fields = {"artist": e.artist, "album": e.album, "genre": e.genre, "year": e.year, "rating": e.rating, "notes": e.notes}
+        self._log({"op": "edit", "id": entry_id, "fields": fields})
         return True
 
     def get(self, entry_id: int) -> Optional[MusicEntry]:
-        return next((e for e in self.entries if e.id == entry_id), None)
+        return self._by_id.get(entry_id)
+
+    def to_columnar(self) -> ColumnarCatalog:
+        """Компактная колоночная копия каталога — для чтения больших объёмов."""
+        return ColumnarCatalog.from_entries(self._by_id.values())
 
     # --- Persistence ---
-    def load(self) -> None:
-        if not os.path.exists(self.path):
-            self.entries = []
-            self._next_id = 1
-            return
+    @contextmanager
+    def transaction(self) -> Iterator["MusicDirectory"]:
+        """Пакет изменений: одна запись на диск в конце, откат при ошибке."""
+        self._tx_depth += 1
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-            self.entries = [MusicEntry.from_dict(d) for d in raw.get("entries", [])]
-            if self.entries:
-                self._next_id = max(e.id for e in self.entries) + 1
+            yield self
+        except BaseException:
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                # Изменения в памяти уже сделаны — возвращаемся к состоянию на диске.
+                self._pending.clear()
+                self.load()
+            raise
+        self._tx_depth -= 1
+        if self._tx_depth == 0:
+            self._commit()
+
+    def _log(self, op: Dict) -> None:
+        self._pending.append(op)
+        if self._tx_depth == 0:
+            self._commit()
+
+    def _commit(self, compact: bool = True) -> None:
+        if not self._pending:
+            return
+        if compact and self._journal_ops + len(self._pending) >= COMPACT_EVERY:
+            # Крупный пакет дешевле сразу записать снимком, чем журналом.
+            self.save()
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            for op in self._pending:
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_ops += sum(len(op.get("entries", ())) or 1 for op in self._pending)
+        self._pending.clear()
+
+    def _apply(self, op: Dict) -> None:
+        """Повтор операции из журнала. Операции идемпотентны: журнал,
+        переживший сбой при сворачивании, можно применить к новому снимку."""
+        kind = op.get("op")
+        if kind in ("add", "add_many"):
+            for d in op.get("entries") or [op["entry"]]:
+                e = MusicEntry.from_dict(d)
+                if e.id in self._by_id:
+                    self._unindex(self._by_id[e.id])
+                self._index(e)
+                self._next_id = max(self._next_id, e.id + 1)
+        elif kind == "edit" and op["id"] in self._by_id:
+            e = self._by_id[op["id"]]
+            self._unindex_fields(e)
+            for k, v in op["fields"].items():
+                setattr(e, k, sys.intern(v) if k in ("artist", "genre") else v)
+            self._index_fields(e)
+        elif kind == "delete" and op["id"] in self._by_id:
+            self._unindex(self._by_id[op["id"]])
+
+    def _replay_journal(self) -> None:
+        self._journal_ops = 0
+        if not os.path.exists(self.journal_path):
+            return
+        good = 0  # конец последней целой записи, в байтах
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    op = json.loads(line)
+                except ValueError:
+                    break  # недописанная строка — сбой во время записи
+                self._apply(op)
+                self._journal_ops += len(op.get("entries", ())) or 1
+                good += len(line)
             else:
-                self._next_id = 1
+                return
+        # Обрезаем хвост: иначе следующий _commit допишет операции прямо
+        # к обрывку, и при загрузке они потеряются вместе с ним.
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(good)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _snapshot_stamp(self) -> List[int]:
+        st = os.stat(self.path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def load(self) -> None:
+        self.entries = []
+        self._next_id = 1
+        self.load_error = None
+        try:
+            if os.path.exists(self.path):
+                fmt, entries = read_snapshot(self.path)
+                # Без явно заданного формата снимок пишется в том же, в каком прочитан.
+                self.snapshot_format = self.snapshot_format or fmt
+                text = None
+                if self.persist_index:
+                    text = TrigramIndex.restore(self.text_index_path, self._snapshot_stamp())
+                self._reset(entries, text)
+                if self._by_id:
+                    self._next_id = max(self._by_id) + 1
+            self._replay_journal()
         except Exception as ex:
             print(f"Не удалось загрузить данные: {ex}")
+            self.load_error = ex
             self.entries = []
             self._next_id = 1
 
     def save(self) -> None:
-        payload = {"entries": [e.to_dict() for e in self.entries]}
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        """Полный снимок каталога (атомарная замена файла) и очистка журнала."""
+        write_snapshot(self.path, self._by_id.values(), self.snapshot_format or "json")
+        if self.persist_index:
+            self._text.dump(self.text_index_path, self._snapshot_stamp())
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_ops = 0
+        self._pending.clear()
 
     # --- CSV ---
     def export_csv(self, csv_path: str) -> None:
@@ -161,34 +749,136 @@ class MusicDirectory:
         if not os.path.exists(csv_path):
             raise FileNotFoundError("CSV файл не найден")
         added = 0
-        with open(csv_path, "r", encoding="utf-8") as f:
+        with open(csv_path, "r", encoding="utf-8") as f, self.transaction():
             reader = csv.DictReader(f, delimiter=";")
             for row in reader:
                 try:
-                    self.add_entry(
-                        artist=row.get("artist", ""),
-                        album=row.get("album", ""),
-                        genre=row.get("genre", ""),
-                        year=int(row.get("year", 0)),
-                        rating=int(row["rating"]) if row.get("rating") not in (None, "", "None") else None,
-                        notes=row.get("notes", ""),
-                    )
+                    self.add_entry(*self._parse_csv_row(row))
                     added += 1
                 except Exception as ex:
                     print(f"Строка пропущена ({ex}): {row}")
         return added
 
+    @staticmethod
+    def _parse_csv_row(row: Dict) -> Tuple[str, str, str, int, Optional[int], str]:
+        return (
+            row.get("artist") or "",
+            row.get("album") or "",
+            row.get("genre") or "",
+            int(row.get("year") or 0),
+            int(row["rating"]) if row.get("rating") not in (None, "", "None") else None,
+            row.get("notes") or "",
+        )
+
+    @staticmethod
+    def _dedupe_key(artist: str, album: str, year: int) -> Tuple[str, str, int]:
+        # Импорт отбрасывает только точные повторы. Нечёткий normalize_name
+        # склеивает разные записи («Mika»/«Mica», «!!!»/«???») — такие пары
+        # лишь предлагаются к слиянию через --dedupe.
+        return artist.strip().casefold(), album.strip().casefold(), int(year)
+
+    def import_csv_bulk(self, csv_path: str, errors_path: Optional[str] = None, batch_size: int = IMPORT_BATCH) -> ImportReport:
+        """Пакетный импорт: чтение → проверка → отсев дублей → запись пачками.
+
+        Отклонённые строки пишутся в отдельный CSV (по умолчанию <csv>.errors.csv),
+        принятые попадают в журнал пачками по batch_size, в конце — один снимок.
+        """
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError("CSV файл не найден")
+        errors_path = errors_path or csv_path + ".errors.csv"
+        report = ImportReport()
+        started = time.perf_counter()
+        seen = {self._dedupe_key(e.artist, e.album, e.year) for e in self._by_id.values()}
+        batch: List[Tuple[str, str, str, int, Optional[int], str]] = []
+        errors_file = None
+        errors_writer = None
+        try:
+            with open(csv_path, "r", encoding="utf-8", newline="") as f:
+                reader = csv.DictReader(f, delimiter=";")
+                for row in reader:
+                    try:
+                        fields = self._parse_csv_row(row)
+                        self._validate(*fields[:5])
+                    except Exception as ex:
+                        if errors_writer is None:
+                            errors_file = open(errors_path, "w", encoding="utf-8", newline="")
+                            errors_writer = csv.writer(errors_file, delimiter=";")
+                            errors_writer.writerow([*(reader.fieldnames or []), "error"])
+                        errors_writer.writerow([*row.values(), str(ex)])
+                        report.rejected += 1
+                        continue
+                    key = self._dedupe_key(fields[0], fields[1], fields[3])
+                    if key in seen:
+                        report.duplicates += 1
+                        continue
+                    seen.add(key)
+                    batch.append(fields)
+                    if len(batch) >= batch_size:
+                        report.added += self._add_batch(batch)
+                        batch = []
+                report.added += self._add_batch(batch)
+        finally:
+            if errors_file is not None:
+                errors_file.close()
+                report.errors_path = errors_path
+        if self._journal_ops >= COMPACT_EVERY:
+            self.save()
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def _add_batch(self, batch: List[Tuple[str, str, str, int, Optional[int], str]]) -> int:
+        if not batch:
+            return 0
+        # Диапазон id выделяется на всю пачку сразу, время создания — одно на пачку.
+        first_id = self._next_id
+        self._next_id += len(batch)
+        created_at = now_stamp()
+        # insort в каждое представление стоил бы O(n) на запись; после пачки
+        # они перестраиваются заново при первом запросе.
+        self._views = {}
+        added = []
+        for entry_id, (artist, album, genre, year, rating, notes) in enumerate(batch, start=first_id):
+            entry = MusicEntry(entry_id, sys.intern(artist.strip()), album.strip(), sys.intern(genre.strip()), int(year), rating, notes.strip(), created_at)
+            self._index(entry)
+            added.append(entry.to_dict())
+        # Пачка журналируется одной строкой сразу; сворачивание в снимок —
+        # один раз в конце импорта.
+        self._pending.append({"op": "add_many", "entries": added})
+        self._commit(compact=False)
+        return len(batch)
+
     # --- Доп. возможности ---
-    def recommend(self) -> Optional[MusicEntry]:
-        """Простая рекомендация: лучшая оценка, затем самый свежий."""
-        if not self.entries:
-            return None
-        return sorted(self.entries, key=lambda e: (-(e.rating or 0), -e.year, e.artist.lower()))[0]
+    def recommend(self, k: Optional[int] = None) -> Union[Optional[MusicEntry], List[MusicEntry]]:
+        """Простая рекомендация: лучшая оценка, затем самый свежий.
+
+        Без k — одна запись (или None), с k — список k лучших: срез
+        поддерживаемого представления, O(k).
+        """
+        top = [self._by_id[key[-1]] for key in self._view("recommend")[:max(1 if k is None else k, 0)]]
+        if k is None:
+            return top[0] if top else None
+        return top
 
     def stats_by_genre(self) -> Dict[str, int]:
-        result: Dict[str, int] = {}
-        for e in self.entries:
-            result[e.genre] = result.get(e.genre, 0) + 1
+        result = {genre: len(ids) for genre, ids in self._by_genre.items()}
+        return dict(sorted(result.items(), key=lambda kv: (-kv[1], kv[0].lower())))
+
+    # Статистика ниже читает поддерживаемые счётчики: O(число групп), а не O(каталог).
+    def stats_by_year(self) -> Dict[int, int]:
+        return {year: len(self._by_year[year]) for year in sorted(self._by_year)}
+
+    def stats_by_decade(self) -> Dict[int, int]:
+        return dict(sorted(self._by_decade.items()))
+
+    def rating_histogram(self) -> Dict[Optional[int], int]:
+        """Число записей по оценкам 1..10; ключ None — записи без оценки."""
+        result = {r: self._by_rating[r] for r in sorted(k for k in self._by_rating if k is not None)}
+        if None in self._by_rating:
+            result[None] = self._by_rating[None]
+        return result
+
+    def mean_rating_by_genre(self) -> Dict[str, float]:
+        result = {genre: total / count for genre, (total, count) in self._genre_rating.items()}
         return dict(sorted(result.items(), key=lambda kv: (-kv[1], kv[0].lower())))
 
     # --- Валидация ---
@@ -208,28 +898,608 @@ class MusicDirectory:
             if not 1 <= rating <= 10:
                 raise ValueError("Оценка должна быть от 1 до 10")
 
-# --------------------------- Представление (CLI) ---------------------------
+# --------------------------- Хранилище SQLite ---------------------------
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+ENTRY_COLUMNS = ("id", "artist", "album", "genre", "year", "rating", "notes", "created_at")
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    rating INTEGER,
+    notes TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_artist ON entries(artist);
+CREATE INDEX IF NOT EXISTS idx_entries_genre ON entries(genre);
+CREATE INDEX IF NOT EXISTS idx_entries_year ON entries(year);
+CREATE INDEX IF NOT EXISTS idx_entries_recommend ON entries(COALESCE(rating, 0) DESC, year DESC);
+"""
+
+# Полнотекстовый индекс заметок: токенизатор trigram ищет подстроки, как и
+# триграммный индекс JSON-хранилища. Синхронизируется триггерами.
+SQLITE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(notes, content='entries', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, notes) VALUES (new.id, new.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE OF notes ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+    INSERT INTO entries_fts(rowid, notes) VALUES (new.id, new.notes);
+END;
+"""
+
+
+class SQLiteMusicDirectory:
+    """Хранилище справочника в SQLite с тем же API, что и MusicDirectory.
+
+    Фильтры и сортировка выполняются в SQL. Запросы параметризованы и
+    неизменны по тексту, поэтому sqlite3 переиспользует подготовленные
+    выражения из своего кэша.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None, cached_statements=256)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Python-овский lower() понимает кириллицу, встроенный LOWER в SQLite — нет.
+        self.conn.create_function("py_lower", 1, lambda s: None if s is None else str(s).lower(), deterministic=True)
+        self.conn.executescript(SQLITE_SCHEMA)
+        try:
+            self.conn.executescript(SQLITE_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False  # сборка SQLite без FTS5/trigram
+        self._tx_depth = 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @staticmethod
+    def _row(row: Tuple) -> MusicEntry:
+        return MusicEntry(*row)
+
+    # --- Транзакции ---
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteMusicDirectory"]:
+        if self._tx_depth == 0:
+            self.conn.execute("BEGIN")
+        self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                self.conn.execute("ROLLBACK")
+            raise
+        self._tx_depth -= 1
+        if self._tx_depth == 0:
+            self.conn.execute("COMMIT")
+
+    def load(self) -> None:
+        pass  # данные всегда читаются из базы
+
+    def save(self) -> None:
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    # --- CRUD ---
+    @property
+    def entries(self) -> List[MusicEntry]:
+        return [self._row(r) for r in self.conn.execute("SELECT * FROM entries ORDER BY id")]
+
+    def add_entry(self, artist: str, album: str, genre: str, year: int, rating: Optional[int] = None, notes: str = "") -> MusicEntry:
+        MusicDirectory._validate(artist, album, genre, year, rating)
+        created_at = now_stamp()
+        cur = self.conn.execute(
+            "INSERT INTO entries (artist, album, genre, year, rating, notes, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (artist.strip(), album.strip(), genre.strip(), int(year), rating, notes.strip(), created_at),
+        )
+        return MusicEntry(cur.lastrowid, artist.strip(), album.strip(), genre.strip(), int(year), rating, notes.strip(), created_at)
+
+    def get(self, entry_id: int) -> Optional[MusicEntry]:
+        row = self.conn.execute("SELECT * FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def delete_entry(self, entry_id: int) -> bool:
+        return self.conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,)).rowcount > 0
+
+    def edit_entry(self, entry_id: int, **updates) -> bool:
+        e = self.get(entry_id)
+        if not e:
+            return False
+        artist = updates.get("artist", e.artist)
+        album = updates.get("album", e.album)
+        genre = updates.get("genre", e.genre)
+        year = int(updates.get("year", e.year))
+        rating = updates.get("rating", e.rating)
+        notes = updates.get("notes", e.notes)
+        MusicDirectory._validate(artist, album, genre, year, rating)
+        self.conn.execute(
+            "UPDATE entries SET artist = ?, album = ?, genre = ?, year = ?, rating = ?, notes = ? WHERE id = ?",
+            (artist.strip(), album.strip(), genre.strip(), year, rating, notes.strip(), entry_id),
+        )
+        return True
+
+    def list_entries(self, sort_by: str = "id", reverse: bool = False, filter_by: Optional[Dict] = None) -> List[MusicEntry]:
+        return list(self.iter_entries(sort_by, reverse, filter_by))
+
+    def iter_entries(self, sort_by: str = "id", reverse: bool = False, filter_by: Optional[Dict] = None) -> Iterator[MusicEntry]:
+        """Записи читаются из курсора по мере надобности."""
+        if sort_by not in ENTRY_COLUMNS:
+            sort_by = "id"
+        where: List[str] = []
+        params: List[Any] = []
+        for k, v in (filter_by or {}).items():
+            if v is None or v == "" or k not in ENTRY_COLUMNS:
+                continue
+            needle = str(v).lower()
+            if k == "notes" and self.has_fts and len(needle) >= 3:
+                # FTS отбирает кандидатов, instr уточняет регистр как в Python.
+                where.append("id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+                params.append('"' + needle.replace('"', '""') + '"')
+            where.append(f"instr(py_lower({k}), ?) > 0")
+            params.append(needle)
+        direction = "DESC" if reverse else "ASC"
+        # NULL (нет оценки) — в конце при прямом порядке, как в JSON-хранилище.
+        sql = "SELECT * FROM entries"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # Равные значения — по возрастанию id и при обратном порядке.
+        sql += f" ORDER BY {sort_by} IS NULL {direction}, {sort_by} {direction}, id"
+        for r in self.conn.execute(sql, params):
+            yield self._row(r)
+
+    # --- CSV ---
+    def export_csv(self, csv_path: str) -> None:
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(list(ENTRY_COLUMNS))
+            for row in self.conn.execute("SELECT * FROM entries ORDER BY id"):
+                writer.writerow(["" if v is None else v for v in row])
+
+    def import_csv(self, csv_path: str) -> int:
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError("CSV файл не найден")
+        added = 0
+        with open(csv_path, "r", encoding="utf-8") as f, self.transaction():
+            for row in csv.DictReader(f, delimiter=";"):
+                try:
+                    self.add_entry(*MusicDirectory._parse_csv_row(row))
+                    added += 1
+                except Exception as ex:
+                    print(f"Строка пропущена ({ex}): {row}")
+        return added
+
+    def import_csv_bulk(self, csv_path: str, errors_path: Optional[str] = None, batch_size: int = IMPORT_BATCH) -> ImportReport:
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError("CSV файл не найден")
+        errors_path = errors_path or csv_path + ".errors.csv"
+        report = ImportReport()
+        started = time.perf_counter()
+        seen = {
+            MusicDirectory._dedupe_key(artist, album, year)
+            for artist, album, year in self.conn.execute("SELECT artist, album, year FROM entries")
+        }
+        created_at = now_stamp()
+        batch: List[Tuple] = []
+        errors_file = None
+        errors_writer = None
+        insert = "INSERT INTO entries (artist, album, genre, year, rating, notes, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        try:
+            with open(csv_path, "r", encoding="utf-8", newline="") as f, self.transaction():
+                reader = csv.DictReader(f, delimiter=";")
+                for row in reader:
+                    try:
+                        artist, album, genre, year, rating, notes = MusicDirectory._parse_csv_row(row)
+                        MusicDirectory._validate(artist, album, genre, year, rating)
+                    except Exception as ex:
+                        if errors_writer is None:
+                            errors_file = open(errors_path, "w", encoding="utf-8", newline="")
+                            errors_writer = csv.writer(errors_file, delimiter=";")
+                            errors_writer.writerow([*(reader.fieldnames or []), "error"])
+                        errors_writer.writerow([*row.values(), str(ex)])
+                        report.rejected += 1
+                        continue
+                    key = MusicDirectory._dedupe_key(artist, album, year)
+                    if key in seen:
+                        report.duplicates += 1
+                        continue
+                    seen.add(key)
+                    batch.append((artist.strip(), album.strip(), genre.strip(), year, rating, notes.strip(), created_at))
+                    if len(batch) >= batch_size:
+                        self.conn.executemany(insert, batch)
+                        report.added += len(batch)
+                        batch = []
+                self.conn.executemany(insert, batch)
+                report.added += len(batch)
+        finally:
+            if errors_file is not None:
+                errors_file.close()
+                report.errors_path = errors_path
+        report.seconds = time.perf_counter() - started
+        return report
+
+    # --- Доп. возможности ---
+    def recommend(self, k: Optional[int] = None) -> Union[Optional[MusicEntry], List[MusicEntry]]:
+        rows = self.conn.execute(
+            "SELECT * FROM entries ORDER BY COALESCE(rating, 0) DESC, year DESC, py_lower(artist), id LIMIT ?",
+            (max(1 if k is None else k, 0),),
+        )
+        top = [self._row(r) for r in rows]
+        if k is None:
+            return top[0] if top else None
+        return top
+
+    def stats_by_genre(self) -> Dict[str, int]:
+        rows = self.conn.execute("SELECT genre, COUNT(*) FROM entries GROUP BY genre")
+        return dict(sorted(rows, key=lambda kv: (-kv[1], kv[0].lower())))
+
+    def stats_by_year(self) -> Dict[int, int]:
+        return dict(self.conn.execute("SELECT year, COUNT(*) FROM entries GROUP BY year ORDER BY year"))
+
+    def stats_by_decade(self) -> Dict[int, int]:
+        return dict(self.conn.execute("SELECT year / 10 * 10 AS decade, COUNT(*) FROM entries GROUP BY decade ORDER BY decade"))
+
+    def rating_histogram(self) -> Dict[Optional[int], int]:
+        rows = self.conn.execute("SELECT rating, COUNT(*) FROM entries GROUP BY rating ORDER BY rating IS NULL, rating")
+        return dict(rows)
+
+    def mean_rating_by_genre(self) -> Dict[str, float]:
+        rows = self.conn.execute("SELECT genre, AVG(rating) FROM entries WHERE rating IS NOT NULL GROUP BY genre")
+        return dict(sorted(rows, key=lambda kv: (-kv[1], kv[0].lower())))
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: str) -> int:
+    """Однократный перенос JSON-справочника (снимок + журнал) в пустую базу SQLite.
+
+    Если исходный файл отсутствует или не читается, бросает исключение
+    и не создаёт базу.
+    """
+    if not os.path.exists(json_path):
+        raise FileNotFoundError(f"Файл {json_path} не найден")
+    source = MusicDirectory(json_path)
+    if source.load_error is not None:
+        raise ValueError(f"Не удалось прочитать {json_path}: {source.load_error}") from source.load_error
+    target = SQLiteMusicDirectory(db_path)
+    try:
+        if target.conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone():
+            raise ValueError(f"База {db_path} уже содержит записи")
+        rows = [tuple(getattr(e, c) for c in ENTRY_COLUMNS) for e in source.entries]
+        with target.transaction():
+            target.conn.executemany(f"INSERT INTO entries ({', '.join(ENTRY_COLUMNS)}) VALUES ({', '.join('?' * len(ENTRY_COLUMNS))})", rows)
+        return len(rows)
+    finally:
+        target.close()
+
+
+def open_directory(path: str = DATA_FILE, persist_index: bool = False, snapshot_format: Optional[str] = None):
+    """Хранилище по расширению файла: .db/.sqlite/.sqlite3 — SQLite, иначе файл-снимок."""
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        return SQLiteMusicDirectory(path)
+    return MusicDirectory(path, persist_index=persist_index, snapshot_format=snapshot_format)
+
+# --------------------------- Поиск дубликатов ---------------------------
+
+# Кириллица -> латиница, чтобы «Кино» и «Kino» давали один ключ.
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya", "і": "i", "ї": "i", "є": "e",
+})
+# Латинские написания, которые по-разному передают один звук.
+_FOLD = (("kh", "h"), ("ck", "k"), ("ph", "f"), ("w", "v"), ("q", "k"), ("c", "k"), ("j", "i"), ("y", "i"))
+_NON_ALNUM = re.compile(r"[^0-9a-z\n]+")
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+_REPEATS = re.compile(r"([a-z])\1+")
+_NUMBERS = re.compile(r"\d+")
+
+DEDUPE_THRESHOLD = 0.8  # минимальное сходство (коэффициент Дайса по биграммам)
+SMALL_BLOCK = 4  # блоки не больше этого сравниваются попарно, без префиксного фильтра
+
+
+def normalize_names(texts: List[str]) -> List[str]:
+    """Ключи для сравнения названий: регистр, диакритика, транслит, пробелы и знаки.
+
+    Строки склеиваются через перевод строки и обрабатываются одним текстом —
+    так каждое преобразование проходит по данным один раз, а не по разу на строку.
+    """
+    text = "\n".join(texts)
+    if text.count("\n") != len(texts) - 1:
+        return [normalize_name(t) for t in texts]
+    text = _COMBINING.sub("", unicodedata.normalize("NFKD", text.casefold())).translate(_TRANSLIT)
+    for src, dst in _FOLD:
+        text = text.replace(src, dst)
+    text = _REPEATS.sub(r"\1", _NON_ALNUM.sub(" ", text))
+    keys = []
+    for line in text.split("\n"):
+        words = line.split()
+        if len(words) > 1 and words[0] == "the":
+            del words[0]
+        keys.append(" ".join(words))
+    return keys
+
+
+def normalize_name(text: str) -> str:
+    return normalize_names([text.replace("\n", " ")])[0]
+
+
+def bigrams(key: str) -> Set[str]:
+    padded = f" {key} "
+    return set(map(str.__add__, padded, padded[1:]))
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Коэффициент Дайса для множеств биграмм."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def _prefix_length(size: int, jaccard: float) -> int:
+    """Сколько редчайших биграмм ключа достаточно проверить при пороге Жаккара.
+
+    Поправка на погрешность: 0.8 / 1.2 * 9 даёт 6.000…01, и без неё ceil
+    укоротил бы префикс на одну биграмму.
+    """
+    return size - math.ceil(jaccard * size - 1e-9) + 1
+
+
+@dataclass
+class DuplicateGroup:
+    keep: MusicEntry
+    duplicates: List[MusicEntry]
+
+
+class _DisjointSet:
+    def __init__(self) -> None:
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent.get(x, x)
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent.setdefault(min(ra, rb), min(ra, rb))
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _pick_keeper(group: List[MusicEntry]) -> MusicEntry:
+    # Остаётся самая полная запись, при равенстве — самая ранняя.
+    return min(group, key=lambda e: (e.rating is None, -len(e.notes), e.id))
+
+
+@gc_paused()
+def find_duplicates(entries: Iterable[MusicEntry], threshold: float = DEDUPE_THRESHOLD) -> List[DuplicateGroup]:
+    """Группы записей об одном и том же альбоме.
+
+    Названия сводятся к ключам normalize_name (каждая различная строка —
+    один раз). Записи с совпадающими ключами исполнителя, альбома и годом
+    объединяются сразу. Нечёткое сравнение идёт только внутри блоков: ключи
+    альбомов одного исполнителя и ключи исполнителей одного альбома. Годы
+    при этом должны отличаться не больше чем на один.
+
+    Блок дробится на окна по годам, а в крупном окне сравниваются лишь
+    пары, у которых совпала хотя бы одна биграмма из префикса (биграммы
+    ключа упорядочены от редких к частым): при сходстве не ниже порога
+    общая биграмма в префиксах обязана найтись.
+    """
+    entries = list(entries)
+    names = dict.fromkeys(e.artist for e in entries)
+    names.update(dict.fromkeys(e.album for e in entries))
+    names = dict(zip(names, normalize_names(list(names))))
+    exact: Dict[Tuple[str, str, int], int] = {}
+    by_id: Dict[int, MusicEntry] = {}
+    sets = _DisjointSet()
+    by_artist: Dict[str, Dict[str, List[Tuple[int, int]]]] = {}
+    by_album: Dict[str, Dict[str, List[Tuple[int, int]]]] = {}
 
-def print_table(entries: List[MusicEntry]) -> None:
-    if not entries:
-        print("Записей нет.")
-        return
-    cols = ["ID", "Исполнитель", "Альбом", "Жанр", "Год", "Оценка", "Заметки"]
-    rows = []
     for e in entries:
-        rows.append([e.id, e.artist, e.album, e.genre, e.year, e.rating if e.rating is not None else "-", (e.notes or "-")])
-    widths = [len(c) for c in cols]
+        by_id[e.id] = e
+        artist, album = names[e.artist], names[e.album]
+        first = exact.setdefault((artist, album, e.year), e.id)
+        if first != e.id:
+            sets.union(first, e.id)
+            continue
+        albums = by_artist.setdefault(artist, {})
+        years = albums.get(album)
+        if years is None:
+            # Один и тот же список — в обоих блоках.
+            years = albums[album] = by_album.setdefault(album, {})[artist] = []
+        years.append((e.year, e.id))
+
+    grams: Dict[str, Set[str]] = {}
+    # Порог Дайса d соответствует порогу Жаккара d / (2 - d).
+    jaccard = threshold / (2 - threshold)
+
+    def gram_set(k: str) -> Set[str]:
+        g = grams.get(k)
+        if g is None:
+            g = grams[k] = bigrams(k)
+        return g
+
+    def link(left: List[Tuple[int, int]], right: List[Tuple[int, int]]) -> None:
+        for year_a, id_a in left:
+            for year_b, id_b in right:
+                if abs(year_a - year_b) <= 1:
+                    sets.union(id_a, id_b)
+
+    def check(a: str, b: str) -> bool:
+        ga, gb = gram_set(a), gram_set(b)
+        la, lb = len(ga), len(gb)
+        # Сначала дешёвая проверка размеров: пересечение не больше меньшего множества.
+        if 2 * (la if la < lb else lb) / (la + lb) < threshold or 2 * len(ga & gb) / (la + lb) < threshold:
+            return False
+        # Числа в названии («Vol. 1» и «Vol. 2») должны совпадать точно.
+        return _NUMBERS.findall(a) == _NUMBERS.findall(b)
+
+    def compare_keys(block: Dict[str, List[Tuple[int, int]]], keys: List[str]) -> None:
+        if len(keys) <= SMALL_BLOCK:
+            # Для горстки ключей перебор пар дешевле построения префиксов.
+            for i, a in enumerate(keys):
+                for b in keys[i + 1:]:
+                    if check(a, b):
+                        link(block[a], block[b])
+            return
+        # Порядок «от редких к частым» должен быть общим лишь для ключей,
+        # которые сравниваются между собой, поэтому частоты считаются по окну.
+        # При равной частоте решает сама биграмма.
+        freq = Counter(chain.from_iterable(map(gram_set, keys)))
+        order = {bg: (n, bg) for bg, n in freq.items()}.__getitem__
+        postings: Dict[str, List[int]] = {}
+        for i, a in enumerate(keys):
+            ga = grams[a]
+            candidates: Set[int] = set()
+            for bg in sorted(ga, key=order)[:_prefix_length(len(ga), jaccard)]:
+                hits = postings.get(bg)
+                if hits is None:
+                    postings[bg] = [i]
+                else:
+                    candidates.update(hits)
+                    hits.append(i)
+            for j in candidates:
+                b = keys[j]
+                if check(a, b):
+                    link(block[a], block[b])
+
+    def compare(block: Dict[str, List[Tuple[int, int]]]) -> None:
+        # Годы дубликатов отличаются не больше чем на один, так что ключи
+        # делятся на окна «год и следующий за ним» и сравниваются внутри окна.
+        by_year: Dict[int, List[str]] = {}
+        for key, years in block.items():
+            for year in {year for year, _ in years}:
+                by_year.setdefault(year, []).append(key)
+        for year, keys in by_year.items():
+            following = by_year.get(year + 1)
+            if following:
+                keys = list(dict.fromkeys(keys + following))
+            if len(keys) > 1:
+                compare_keys(block, keys)
+
+    for albums in by_artist.values():
+        # Тот же ключ, соседний год — тоже дубликат.
+        for years in albums.values():
+            if len(years) > 1:
+                link(years, years)
+        if len(albums) > 1:
+            compare(albums)
+    for artists in by_album.values():
+        if len(artists) > 1:
+            compare(artists)
+
+    clusters: Dict[int, List[MusicEntry]] = {}
+    for entry_id in sets.parent:
+        clusters.setdefault(sets.find(entry_id), []).append(by_id[entry_id])
+    groups = []
+    for members in clusters.values():
+        keep = _pick_keeper(members)
+        groups.append(DuplicateGroup(keep, sorted((e for e in members if e is not keep), key=lambda e: e.id)))
+    groups.sort(key=lambda g: g.keep.id)
+    return groups
+
+
+def merge_duplicates(directory, groups: List[DuplicateGroup]) -> int:
+    """Сливает группы в оставляемые записи; возвращает число удалённых записей.
+
+    Оставляемая запись получает наивысшую оценку группы и все различные
+    заметки. Работает с обоими хранилищами — нужен лишь их общий API.
+    """
+    removed = 0
+    with directory.transaction():
+        for group in groups:
+            members = [group.keep] + group.duplicates
+            ratings = [e.rating for e in members if e.rating is not None]
+            notes = list(dict.fromkeys(e.notes for e in members if e.notes))
+            directory.edit_entry(group.keep.id, rating=max(ratings) if ratings else None, notes="; ".join(notes))
+            for e in group.duplicates:
+                removed += directory.delete_entry(e.id)
+    return removed
+
+
+# --------------------------- Представление (CLI) ---------------------------
+
+TABLE_COLUMNS = ["ID", "Исполнитель", "Альбом", "Жанр", "Год", "Оценка", "Заметки"]
+
+def _table_row(e: MusicEntry) -> List[str]:
+    return [str(e.id), e.artist, e.album, e.genre, str(e.year), str(e.rating) if e.rating is not None else "-", (e.notes or "-")]
+
+def _column_widths(rows: List[List[str]], max_width: Optional[int] = None) -> List[int]:
+    widths = [len(c) for c in TABLE_COLUMNS]
     for r in rows:
         for i, cell in enumerate(r):
-            widths[i] = max(widths[i], len(str(cell)))
+            widths[i] = max(widths[i], len(cell))
+    if max_width is not None:
+        widths = [max(len(c), min(w, max_width)) for c, w in zip(TABLE_COLUMNS, widths)]
+    return widths
+
+def _fit(cell: str, width: int) -> str:
+    return cell.ljust(width) if len(cell) <= width else cell[:width - 1] + "…"
+
+def _print_rows(rows: List[List[str]], widths: List[int]) -> None:
     # header
-    line = " | ".join(str(c).ljust(widths[i]) for i, c in enumerate(cols))
-    sep = "-+-".join("-" * widths[i] for i in range(len(cols)))
-    print(line)
-    print(sep)
+    print(" | ".join(_fit(c, widths[i]) for i, c in enumerate(TABLE_COLUMNS)))
+    print("-+-".join("-" * w for w in widths))
     # body
     for r in rows:
-        print(" | ".join(str(cell).ljust(widths[i]) for i, cell in enumerate(r)))
+        print(" | ".join(_fit(cell, widths[i]) for i, cell in enumerate(r)))
+
+def print_table(entries: List[MusicEntry]) -> None:
+    if not entries:
+        print("Записей нет.")
+        return
+    rows = [_table_row(e) for e in entries]
+    _print_rows(rows, _column_widths(rows))
+
+def print_table_paged(entries: Iterable[MusicEntry], page_size: int = PAGE_SIZE) -> None:
+    """Постраничный вывод: строки берутся из итератора по мере листания,
+    ширина колонок — по первым WIDTH_SAMPLE строкам, длинное обрезается."""
+    source = iter(entries)
+    rows = [_table_row(e) for e in islice(source, WIDTH_SAMPLE)]
+    if not rows:
+        print("Записей нет.")
+        return
+    widths = _column_widths(rows, MAX_CELL_WIDTH)
+    exhausted = len(rows) < WIDTH_SAMPLE
+    page = 0
+    while True:
+        start = page * page_size
+        # +1 строка, чтобы знать, есть ли следующая страница.
+        if not exhausted and len(rows) <= start + page_size:
+            more = [_table_row(e) for e in islice(source, start + page_size + 1 - len(rows))]
+            rows.extend(more)
+            exhausted = len(rows) <= start + page_size
+        chunk = rows[start:start + page_size]
+        _print_rows(chunk, widths)
+        has_next = len(rows) > start + page_size
+        if page == 0 and not has_next:
+            return
+        print(f"Страница {page + 1}, записи {start + 1}–{start + len(chunk)}")
+        hints = ["[Enter] далее" if has_next else None, "[p] назад" if page > 0 else None, "[q] выход"]
+        choice = input(", ".join(h for h in hints if h) + ": ").strip().lower()
+        if choice == "q":
+            return
+        if choice == "p":
+            page = max(page - 1, 0)
+        elif has_next:
+            page += 1
+        else:
+            return
 
 def prompt_int(msg: str, allow_empty: bool = False) -> Optional[int]:
     while True:
@@ -241,8 +1511,8 @@ def prompt_int(msg: str, allow_empty: bool = False) -> Optional[int]:
         except ValueError:
             print("Введите целое число.")
 
-def menu():
-    directory = MusicDirectory()
+def menu(path: str = DATA_FILE, snapshot_format: Optional[str] = None):
+    directory = open_directory(path, persist_index=True, snapshot_format=snapshot_format)
 
     actions = {
         "1": ("Добавить запись", action_add),
@@ -255,6 +1525,9 @@ def menu():
         "8": ("Импорт CSV", action_import),
         "9": ("Рекомендация: что послушать?", action_recommend),
         "10": ("Статистика по жанрам", action_stats),
+        "11": ("Статистика по годам и десятилетиям", action_stats_years),
+        "12": ("Статистика оценок", action_stats_ratings),
+        "13": ("Поиск и слияние дубликатов", action_dedupe),
         "0": ("Выход", None),
     }
 
@@ -290,8 +1563,7 @@ def action_add(directory: MusicDirectory):
 
 def action_list(directory: MusicDirectory):
     print("Список записей:")
-    entries = directory.list_entries()
-    print_table(entries)
+    print_table_paged(directory.iter_entries())
 
 def action_delete(directory: MusicDirectory):
     print("Удаление записи:")
@@ -335,15 +1607,13 @@ def action_search(directory: MusicDirectory):
     if genre: filt["genre"] = genre
     if year: filt["year"] = year
     if rating: filt["rating"] = rating
-    entries = directory.list_entries(filter_by=filt)
-    print_table(entries)
+    print_table_paged(directory.iter_entries(filter_by=filt))
 
 def action_sort(directory: MusicDirectory):
     print("Сортировка по полю (id, artist, album, genre, year, rating):")
     key = input("Поле (по умолчанию id): ").strip() or "id"
     reverse = input("Обратный порядок? (y/N): ").strip().lower() == "y"
-    entries = directory.list_entries(sort_by=key, reverse=reverse)
-    print_table(entries)
+    print_table_paged(directory.iter_entries(sort_by=key, reverse=reverse))
 
 def action_export(directory: MusicDirectory):
     path = input("Файл CSV (по умолчанию export.csv): ").strip() or "export.csv"
@@ -353,18 +1623,23 @@ def action_export(directory: MusicDirectory):
 def action_import(directory: MusicDirectory):
     path = input("Импортировать из CSV (например, export.csv): ").strip()
     try:
-        n = directory.import_csv(path)
-        print(f"Импорт завершён, добавлено записей: {n}")
+        report = directory.import_csv_bulk(path)
+        print(f"Импорт завершён, добавлено записей: {report.added}")
+        print(f"Дубликатов пропущено: {report.duplicates}, строк с ошибками: {report.rejected}")
+        if report.errors_path:
+            print(f"Отчёт об ошибках: {report.errors_path}")
+        print(f"Скорость: {report.rows_per_sec:.0f} строк/с ({report.seconds:.2f} с)")
     except Exception as ex:
         print(f"Ошибка импорта: {ex}")
 
 def action_recommend(directory: MusicDirectory):
-    rec = directory.recommend()
-    if not rec:
+    k = prompt_int("Сколько записей посоветовать? (по умолчанию 1): ", allow_empty=True) or 1
+    top = directory.recommend(k=k)
+    if not top:
         print("Пока нечего рекомендовать — добавьте записи.")
         return
     print("Советуем послушать:")
-    print_table([rec])
+    print_table(top)
 
 def action_stats(directory: MusicDirectory):
     stats = directory.stats_by_genre()
@@ -379,13 +1654,80 @@ def action_stats(directory: MusicDirectory):
     for k, v in stats.items():
         print(f"{k.ljust(width_key)} | {str(v).rjust(width_val)}")
 
+def print_stats(title: str, key_title: str, val_title: str, stats: Dict) -> None:
+    print(title)
+    rows = [(str(k), str(v)) for k, v in stats.items()]
+    width_key = max(len(key_title), max(len(k) for k, _ in rows))
+    width_val = max(len(val_title), max(len(v) for _, v in rows))
+    print(f"{key_title.ljust(width_key)} | {val_title.rjust(width_val)}")
+    print(f"{'-'*width_key}-+-{'-'*width_val}")
+    for k, v in rows:
+        print(f"{k.ljust(width_key)} | {v.rjust(width_val)}")
+
+def action_stats_years(directory: MusicDirectory):
+    by_decade = directory.stats_by_decade()
+    if not by_decade:
+        print("Статистика пуста.")
+        return
+    print_stats("Статистика по десятилетиям:", "Десятилетие", "Кол-во", {f"{d}-е": n for d, n in by_decade.items()})
+    print()
+    print_stats("Статистика по годам:", "Год", "Кол-во", directory.stats_by_year())
+
+def action_stats_ratings(directory: MusicDirectory):
+    hist = directory.rating_histogram()
+    if not hist:
+        print("Статистика пуста.")
+        return
+    print_stats("Распределение оценок:", "Оценка", "Кол-во", {("-" if r is None else r): n for r, n in hist.items()})
+    means = directory.mean_rating_by_genre()
+    if means:
+        print()
+        print_stats("Средняя оценка по жанрам:", "Жанр", "Среднее", {g: f"{m:.2f}" for g, m in means.items()})
+
+def print_duplicates(groups: List[DuplicateGroup], limit: int = PAGE_SIZE) -> None:
+    print(f"Найдено групп дубликатов: {len(groups)}, лишних записей: {sum(len(g.duplicates) for g in groups)}")
+    for n, group in enumerate(groups[:limit], start=1):
+        print(f"\nГруппа {n}: остаётся запись {group.keep.id}")
+        print_table([group.keep] + group.duplicates)
+    if len(groups) > limit:
+        print(f"\n... и ещё групп: {len(groups) - limit}")
+
+def action_dedupe(directory: MusicDirectory):
+    groups = find_duplicates(directory.iter_entries())
+    if not groups:
+        print("Дубликатов не найдено.")
+        return
+    print_duplicates(groups)
+    if input("Объединить все группы? (y/n): ").strip().lower() in ("y", "д", "да", "yes"):
+        print(f"Удалено записей: {merge_duplicates(directory, groups)}")
+
 # --------------------------- Точка входа ---------------------------
 
 def main():
-    if len(sys.argv) > 1 and sys.argv[1] in {"-h", "--help"}:
-        print("Запустите программу без аргументов и следуйте меню.")
+    parser = argparse.ArgumentParser(description="Справочник меломана. Запустите программу и следуйте меню.")
+    parser.add_argument("--data", default=DATA_FILE, help="файл данных: JSON или база SQLite (.db, .sqlite, .sqlite3)")
+    parser.add_argument("--migrate-to", metavar="DB", help="перенести JSON-файл --data в новую базу SQLite и выйти")
+    parser.add_argument("--dedupe", action="store_true", help="показать дубликаты в --data и выйти")
+    parser.add_argument("--merge", action="store_true", help="вместе с --dedupe: слить найденные дубликаты")
+    parser.add_argument("--format", choices=snapshot_formats(), help="формат файла-снимка при сохранении (по умолчанию — как у прочитанного файла, иначе json)")
+    args = parser.parse_args()
+    if args.migrate_to:
+        try:
+            n = migrate_json_to_sqlite(args.data, args.migrate_to)
+        except (OSError, ValueError) as ex:
+            sys.exit(f"Перенос не выполнен: {ex}")
+        print(f"Перенесено записей: {n}")
+        return
+    if args.dedupe:
+        directory = open_directory(args.data, snapshot_format=args.format)
+        started = time.perf_counter()
+        groups = find_duplicates(directory.iter_entries())
+        print_duplicates(groups)
+        print(f"Поиск занял {time.perf_counter() - started:.2f} с")
+        if args.merge and groups:
+            print(f"Удалено записей: {merge_duplicates(directory, groups)}")
         return
-    menu()
+    menu(args.data, args.format)
 
 if __name__ == "__main__":
     main()
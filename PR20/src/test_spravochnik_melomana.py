@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""Проверки справочника меломана: python -m pytest PR20/src"""
+from __future__ import annotations
+
+import os
+import random
+
+import pytest
+
+from spravochnik_melomana import (
+    DEDUPE_THRESHOLD,
+    MusicDirectory,
+    MusicEntry,
+    SMALL_BLOCK,
+    _NUMBERS,
+    _prefix_length,
+    bigrams,
+    find_duplicates,
+    migrate_json_to_sqlite,
+    normalize_name,
+    similarity,
+)
+
+
+def make_directory(tmp_path, n: int = 10) -> MusicDirectory:
+    d = MusicDirectory(str(tmp_path / "data.json"))
+    for i in range(1, n + 1):
+        d.add_entry(f"Исполнитель {i}", f"Альбом {i}", "Рок", 1970 + i, rating=i % 10 + 1)
+    return d
+
+
+def test_torn_journal_tail_does_not_swallow_later_mutations(tmp_path):
+    d = make_directory(tmp_path)
+    with open(d.journal_path, "ab") as f:
+        f.write(b'{"op": "delete", "i')  # сбой посреди записи
+
+    d = MusicDirectory(d.path)
+    assert len(d.entries) == 10
+    assert d.delete_entry(7)
+
+    d = MusicDirectory(d.path)
+    assert d.get(7) is None
+    assert len(d.entries) == 9
+    with open(d.journal_path, "rb") as f:
+        assert f.read().endswith(b"\n")
+
+
+def test_journal_without_torn_tail_is_kept(tmp_path):
+    d = make_directory(tmp_path, 3)
+    size = os.path.getsize(d.journal_path)
+    d = MusicDirectory(d.path)
+    assert len(d.entries) == 3
+    assert os.path.getsize(d.journal_path) == size
+
+
+def test_reverse_sort_keeps_ties_in_id_order(tmp_path):
+    d = MusicDirectory(str(tmp_path / "data.json"))
+    for i in range(30):
+        d.add_entry(f"Исполнитель {i % 4}", f"Альбом {i}", "Рок", 1990 + i % 3, rating=i % 5 + 1)
+    for key in ("year", "rating", "artist"):
+        expected = [e.id for e in sorted(d.entries, key=lambda e: getattr(e, key), reverse=True)]
+        assert [e.id for e in d.list_entries(sort_by=key, reverse=True)] == expected
+        assert [e.id for e in d.iter_entries(sort_by=key, reverse=True)] == expected
+        filtered = [e.id for e in d.list_entries(sort_by=key, reverse=True, filter_by={"genre": "рок"})]
+        assert filtered == expected
+
+
+def test_recommend_with_k(tmp_path):
+    d = make_directory(tmp_path)
+    top = d.recommend(k=3)
+    assert [e.rating for e in top] == [10, 9, 8]
+    assert d.recommend() is top[0]
+
+
+def test_migration_refuses_unreadable_source(tmp_path):
+    db = tmp_path / "data.db"
+    with pytest.raises(FileNotFoundError):
+        migrate_json_to_sqlite(str(tmp_path / "missing.json"), str(db))
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json", encoding="utf-8")
+    with pytest.raises(ValueError):
+        migrate_json_to_sqlite(str(broken), str(db))
+    assert not db.exists()
+
+    d = make_directory(tmp_path)
+    d.save()
+    assert migrate_json_to_sqlite(d.path, str(db)) == 10
+
+
+def test_import_drops_only_exact_duplicates(tmp_path):
+    rows = [
+        ("!!!", "Альбом"), ("???", "Альбом"), ("Mika", "Life"), ("Mica", "Life"),
+        ("Wings", "Band"), ("Vings", "Band"), ("AC/DC", "Back"), ("ACDC", "Back"),
+        (" mika ", "LIFE"),  # отличается только регистром и пробелами — дубль
+    ]
+    csv_path = tmp_path / "import.csv"
+    csv_path.write_text(
+        "artist;album;genre;year;rating;notes\n" + "".join(f"{a};{b};Рок;1990;;\n" for a, b in rows),
+        encoding="utf-8",
+    )
+    d = MusicDirectory(str(tmp_path / "data.json"))
+    report = d.import_csv_bulk(str(csv_path))
+    assert (report.added, report.duplicates) == (8, 1)
+
+
+def _brute_force_groups(entries, threshold=DEDUPE_THRESHOLD):
+    keys = {e.id: (normalize_name(e.artist), normalize_name(e.album)) for e in entries}
+    grams = {k: bigrams(k) for pair in keys.values() for k in pair}
+    parent = {e.id: e.id for e in entries}
+
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    def close(a, b):
+        return a == b or (
+            similarity(grams[a], grams[b]) >= threshold and _NUMBERS.findall(a) == _NUMBERS.findall(b)
+        )
+
+    for i, a in enumerate(entries):
+        for b in entries[i + 1:]:
+            if abs(a.year - b.year) > 1:
+                continue
+            (artist_a, album_a), (artist_b, album_b) = keys[a.id], keys[b.id]
+            if (artist_a == artist_b and close(album_a, album_b)) or (album_a == album_b and close(artist_a, artist_b)):
+                parent[find(b.id)] = find(a.id)
+    clusters = {}
+    for e in entries:
+        clusters.setdefault(find(e.id), set()).add(e.id)
+    return {frozenset(c) for c in clusters.values() if len(c) > 1}
+
+
+def test_find_duplicates_matches_brute_force():
+    # Короткие названия с одной правкой дают много пар со сходством ровно
+    # на пороге и много биграмм с равной частотой.
+    rnd = random.Random(7)
+    letters = "abdefgmn"
+    band = SMALL_BLOCK + 2  # чуть больше SMALL_BLOCK — работает префиксный фильтр
+    entries = []
+    for i in range(1, 100 * band + 1):
+        if i % 2:
+            album = "".join(rnd.choice(letters) for _ in range(rnd.randint(3, 9)))
+        else:
+            chars = list(entries[-1].album)
+            pos = rnd.randrange(len(chars))
+            if rnd.random() < 0.5:
+                chars.insert(pos, rnd.choice(letters))
+            else:
+                chars[pos] = rnd.choice(letters)
+            album = "".join(chars)
+        entries.append(MusicEntry(i, f"Группа {(i - 1) // band}", album, "Рок", 1990))
+
+    def groups(sample):
+        return {frozenset([g.keep.id] + [e.id for e in g.duplicates]) for g in find_duplicates(sample)}
+
+    # В маленьком окне почти все биграммы одинаково редки — порядок
+    # префикса держится только на вторичном ключе.
+    for start in range(0, len(entries), band):
+        sample = entries[start:start + band]
+        assert groups(sample) == _brute_force_groups(sample)
+    # Те же названия у одного исполнителя и с разными годами — для окон по годам.
+    for i, e in enumerate(entries[:300], start=len(entries) + 1):
+        entries.append(MusicEntry(i, "Кино", e.album, "Рок", rnd.randint(1990, 1993)))
+    assert groups(entries) == _brute_force_groups(entries)
+
+
+def test_prefix_length_at_exact_threshold():
+    jaccard = DEDUPE_THRESHOLD / (2 - DEDUPE_THRESHOLD)
+    # 2/3 от 9 биграмм в плавающей точке — 6.000…01; нужно 6 общих, префикс из 4.
+    assert _prefix_length(9, jaccard) == 4
+    assert _prefix_length(15, jaccard) == 6
@@ -1,15 +1,48 @@
 from __future__ import annotations
 
+import codecs
+import csv
+import gc
 import json
+import math
+import os
+import queue
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
 from dataclasses import dataclass, asdict
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 
 
 CATALOG_FILE = Path(__file__).with_name("melomaniac_catalog.json")
+LOAD_BATCH = 5000  # треков за одну передачу в поток Tk
+LOAD_CHUNK = 1 << 20
+LOAD_POLL_MS = 30
+EXPORT_FORMATS = {"txt": "Текстовый отчет", "csv": "CSV", "jsonl": "JSON Lines"}
+EXPORT_PROGRESS_EVERY = 1000  # треков между отметками прогресса
+EXPORT_BUFFER = 1 << 20
+SAVE_DELAY = 0.5  # правки в пределах этого окна сливаются в одну запись на диск
+STATUS_POLL_MS = 200
+SEARCH_DELAY_MS = 250  # поиск запускается, когда ввод затих на это время
+VIEW_BUFFER = 100  # строк, материализованных выше и ниже видимой области
+DUPLICATE_THRESHOLD = 0.8  # минимальное сходство названий (коэффициент Дайса по биграммам)
+DUPLICATES_SHOWN = 10
+
+# Кириллица -> латиница, чтобы «Группа крови» и «Gruppa krovi» давали один ключ.
+_TRANSLIT = str.maketrans({
+    **dict(zip("абвгдезийклмнопрстуфхцыэ", "abvgdeziiklmnoprstufhcye")),
+    "ё": "e", "ж": "zh", "ч": "ch", "ш": "sh", "щ": "sch", "ю": "yu", "я": "ya", "ъ": "", "ь": "",
+})
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+_NON_WORD = re.compile(r"[\W_]+")
+_NUMBERS = re.compile(r"\d+")
 
 
 @dataclass
@@ -24,44 +57,451 @@ class Track:
     notes: str
 
 
-def load_catalog() -> List[Track]:
-    if not CATALOG_FILE.exists():
-        return []
+class Catalog:
+    """Каталог треков: словарь id -> трек в порядке добавления и счётчик id.
+
+    Поиск, добавление и удаление по id — O(1). Счётчик только растёт и
+    сохраняется вместе с треками, так что id удалённого трека не переиспользуется.
+    """
+
+    def __init__(self, tracks: Iterable[Track] = (), next_id: int = 1) -> None:
+        self._tracks: Dict[int, Track] = {}
+        self.next_id = next_id
+        self.extend(tracks)
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __iter__(self) -> Iterator[Track]:
+        return iter(self._tracks.values())
+
+    def __contains__(self, track_id: object) -> bool:
+        return track_id in self._tracks
+
+    def get(self, track_id: Optional[int]) -> Optional[Track]:
+        return self._tracks.get(track_id)
+
+    def allocate_id(self) -> int:
+        track_id = self.next_id
+        self.next_id += 1
+        return track_id
 
+    def add(self, track: Track) -> None:
+        if track.track_id in self._tracks:
+            raise ValueError(f"Трек с id {track.track_id} уже есть в каталоге.")
+        self._tracks[track.track_id] = track
+        self.next_id = max(self.next_id, track.track_id + 1)
+
+    def extend(self, tracks: Iterable[Track]) -> List[Track]:
+        """Добавляет треки пачкой; повторный id пропускается. Возвращает добавленные."""
+        added = [track for track in tracks if track.track_id not in self._tracks]
+        for track in added:
+            self._tracks[track.track_id] = track
+        if added:
+            self.next_id = max(self.next_id, max(track.track_id for track in added) + 1)
+        return added
+
+    def remove(self, track_id: int) -> Optional[Track]:
+        return self._tracks.pop(track_id, None)
+
+    def snapshot(self) -> "Catalog":
+        """Копия для фоновой записи: свой словарь, те же объекты треков."""
+        copy = Catalog()
+        copy._tracks = dict(self._tracks)
+        copy.next_id = self.next_id
+        return copy
+
+
+def _track_from_dict(entry: dict) -> Optional[Track]:
     try:
-        with CATALOG_FILE.open("r", encoding="utf-8") as file:
-            raw_tracks = json.load(file)
-    except (json.JSONDecodeError, OSError):
-        return []
+        return Track(
+            track_id=int(entry["track_id"]),
+            title=str(entry["title"]),
+            artist=str(entry["artist"]),
+            album=str(entry.get("album", "")),
+            genre=str(entry.get("genre", "")),
+            year=int(entry["year"]) if entry.get("year") else None,
+            rating=int(entry["rating"]) if entry.get("rating") else None,
+            notes=str(entry.get("notes", "")),
+        )
+    except (KeyError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class CatalogStream:
+    """Потоковое чтение файла каталога пачками треков.
+
+    Файл читается кусками по LOAD_CHUNK, треки массива "tracks" разбираются
+    по одному через JSONDecoder.raw_decode, так что в памяти не бывает всего
+    текста сразу. Понимает и прежний формат — голый список треков.
+    После исчерпания batches() в next_id лежит сохранённый счётчик.
+    """
+
+    def __init__(self, path: Path, batch_size: int = LOAD_BATCH, chunk_size: int = LOAD_CHUNK) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.size = path.stat().st_size if path.exists() else 0
+        self.consumed = 0  # байт прочитано — для индикатора загрузки
+        self.next_id = 1
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._file: Optional[BinaryIO] = None
+
+    def batches(self) -> Iterator[List[Track]]:
+        if not self.size:
+            return
+        with self.path.open("rb") as self._file:
+            first = self._peek()
+            if first == "[":
+                yield from self._array()
+            elif first == "{":
+                for _ in self._items("}"):
+                    if self._peek() != '"':
+                        raise ValueError("Повреждён файл каталога")
+                    key = self._value()
+                    self._expect(":")
+                    if key == "tracks" and self._peek() == "[":
+                        yield from self._array()
+                    else:
+                        value = self._value()
+                        if key == "next_id" and isinstance(value, int):
+                            self.next_id = value
+            elif first:
+                raise ValueError("Повреждён файл каталога")
+            if self._peek():
+                raise ValueError("Повреждён файл каталога")  # лишние данные после корня
+
+    def _fill(self) -> bool:
+        raw = self._file.read(self.chunk_size)
+        if not raw:
+            return False
+        self.consumed += len(raw)
+        # Разобранное начало буфера больше не нужно.
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(raw)
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Первый непробельный символ с текущей позиции ('' — конец файла)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _value(self) -> object:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Значение обрезано концом куска — дочитываем и пробуем снова.
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self._buffer) and self._fill():
+                continue  # число могло оборваться на границе куска
+            self._pos = end
+            return value
+
+    def _expect(self, char: str) -> None:
+        head = self._peek()
+        if head != char:
+            raise ValueError("Повреждён файл каталога" if head else "Файл каталога оборван")
+        self._pos += 1
+
+    def _items(self, close: str) -> Iterator[None]:
+        """Шаг на каждый элемент массива или объекта с проверкой запятых.
+
+        Как и json.loads, не пропускает ни пропущенную, ни лишнюю запятую:
+        после элемента обязана идти запятая или закрывающая скобка, а после
+        запятой — следующий элемент.
+        """
+        self._pos += 1  # открывающая скобка
+        if self._peek() == close:
+            self._pos += 1
+            return
+        while True:
+            yield
+            head = self._peek()
+            if head == close:
+                self._pos += 1
+                return
+            self._expect(",")
+
+    def _array(self) -> Iterator[List[Track]]:
+        batch: List[Track] = []
+        for _ in self._items("]"):
+            track = _track_from_dict(self._value())
+            if track is not None:
+                batch.append(track)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def save_catalog(catalog: Catalog) -> None:
+    """Атомарная запись: временный файл рядом с каталогом, затем замена."""
+    serialized = {"next_id": catalog.next_id, "tracks": [asdict(track) for track in catalog]}
+    temp_file = CATALOG_FILE.with_name(CATALOG_FILE.name + ".tmp")
+    with temp_file.open("w", encoding="utf-8") as file:
+        json.dump(serialized, file, ensure_ascii=False, separators=(",", ":"))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file, CATALOG_FILE)
 
-    tracks: List[Track] = []
-    for entry in raw_tracks:
-        try:
-            tracks.append(
-                Track(
-                    track_id=int(entry["track_id"]),
-                    title=str(entry["title"]),
-                    artist=str(entry["artist"]),
-                    album=str(entry.get("album", "")),
-                    genre=str(entry.get("genre", "")),
-                    year=int(entry["year"]) if entry.get("year") else None,
-                    rating=int(entry["rating"]) if entry.get("rating") else None,
-                    notes=str(entry.get("notes", "")),
-                )
-            )
-        except (KeyError, ValueError, TypeError):
-            continue
-    return tracks
 
+class CatalogWriter:
+    """Фоновая запись каталога на диск.
 
-def save_catalog(catalog: List[Track]) -> None:
-    serialized = [asdict(track) for track in catalog]
-    with CATALOG_FILE.open("w", encoding="utf-8") as file:
-        json.dump(serialized, file, ensure_ascii=False, indent=2)
+    schedule() лишь запоминает последний снимок списка и будит поток; поток
+    выжидает SAVE_DELAY, так что серия правок даёт одну запись. Состояние
+    (state, error) поток Tk забирает опросом через poll_status() — сам поток
+    виджеты не трогает.
+    """
 
+    def __init__(self, delay: float = SAVE_DELAY) -> None:
+        self.delay = delay
+        self.state = "idle"  # idle / pending / saving / saved / error
+        self.error = ""
+        self._pending: Optional[Catalog] = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="catalog-writer", daemon=True)
+        self._thread.start()
 
-def next_track_id(catalog: List[Track]) -> int:
-    return max((track.track_id for track in catalog), default=0) + 1
+    def schedule(self, catalog: Catalog) -> None:
+        with self._cond:
+            # Копия словаря, а не треков: правки полей после снимка просто
+            # попадут в эту или следующую запись.
+            self._pending = catalog.snapshot()
+            self.state = "pending"
+            self._cond.notify()
+
+    def poll_status(self) -> Tuple[str, str]:
+        """Текущие (state, error); «saved» отдаётся один раз и сменяется на «idle».
+
+        Смена идёт под тем же замком, что и в потоке записи, иначе «idle»
+        могло бы затереть только что выставленные «saving» или «error».
+        """
+        with self._cond:
+            state, error = self.state, self.error
+            if state == "saved":
+                self.state = "idle"
+            return state, error
+
+    def close(self) -> None:
+        """Дописывает последний снимок и останавливает поток."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                if not self._closed:
+                    self._cond.wait_for(lambda: self._closed, timeout=self.delay)
+                snapshot, self._pending = self._pending, None
+                self.state = "saving"
+            try:
+                save_catalog(snapshot)
+            except Exception as exc:
+                # Любая ошибка (диск, сериализация) лишь отмечается: поток должен
+                # дожить до следующего schedule(), иначе правки перестанут сохраняться.
+                message = str(exc) if isinstance(exc, OSError) else f"{type(exc).__name__}: {exc}"
+                with self._cond:
+                    self.state, self.error = "error", message
+                continue
+            with self._cond:
+                if self._pending is None:
+                    self.state = "saved"
+
+
+def _name_key(text: str) -> str:
+    """Ключ названия для поиска дублей: регистр, диакритика, транслит, знаки и пробелы.
+
+    Строка из одних знаков («!!!») сравнивается как есть, иначе все такие
+    названия получили бы пустой ключ.
+    """
+    key = _COMBINING.sub("", unicodedata.normalize("NFKD", text.casefold())).translate(_TRANSLIT)
+    return " ".join(_NON_WORD.sub(" ", key).split()) or text.strip().casefold()
+
+
+def _bigrams(key: str) -> Set[str]:
+    padded = f" {key} "
+    return set(map(str.__add__, padded, padded[1:]))
+
+
+def find_duplicate_tracks(catalog: Iterable[Track], threshold: float = DUPLICATE_THRESHOLD) -> List[List[Track]]:
+    """Группы одинаковых треков; первым в группе идёт тот, что останется.
+
+    Треки разбиваются на блоки по ключу «исполнитель + альбом», и похожие
+    названия ищутся только внутри блока. Сравниваются лишь пары, у которых
+    совпала биграмма из префикса (биграммы упорядочены от редких к частым):
+    при сходстве не ниже порога такая общая биграмма обязательно есть.
+    """
+    blocks: Dict[Tuple[str, str], Dict[str, List[Track]]] = {}
+    gc_enabled = gc.isenabled()
+    gc.disable()  # проходы сборщика по растущей куче почти удваивают время
+    try:
+        tracks = list(catalog)
+        names = dict.fromkeys(chain.from_iterable((t.artist, t.album, t.title) for t in tracks))
+        names = {name: _name_key(name) for name in names}
+        for track in tracks:
+            block = blocks.setdefault((names[track.artist], names[track.album]), {})
+            block.setdefault(names[track.title], []).append(track)
+
+        grams = {title: _bigrams(title) for block in blocks.values() if len(block) > 1 for title in block}
+        freq = Counter(chain.from_iterable(grams.values()))
+        # Порог Дайса d соответствует порогу Жаккара d / (2 - d).
+        jaccard = threshold / (2 - threshold)
+        # Порядок должен быть общим для всех ключей: при равной частоте решает сама биграмма.
+        order = {bigram: (n, bigram) for bigram, n in freq.items()}.__getitem__
+
+        groups: List[List[Track]] = []
+        for block in blocks.values():
+            keys = list(block)
+            parent = list(range(len(keys)))
+
+            def find(i: int) -> int:
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+
+            if len(keys) > 1:
+                postings: Dict[str, List[int]] = {}
+                for i, title in enumerate(keys):
+                    ga = grams[title]
+                    # round убирает хвост вроде 6.000…01 у 0.8 / 1.2 * 9, иначе ceil
+                    # укоротил бы префикс и пары ровно на пороге терялись бы.
+                    prefix = sorted(ga, key=order)[:len(ga) - math.ceil(round(jaccard * len(ga), 9)) + 1]
+                    seen: Set[int] = set()
+                    for bigram in prefix:
+                        for j in postings.setdefault(bigram, []):
+                            if j in seen:
+                                continue
+                            seen.add(j)
+                            gb = grams[keys[j]]
+                            # Числа в названии («Часть 1» и «Часть 2») должны совпадать точно.
+                            if (
+                                2 * len(ga & gb) >= threshold * (len(ga) + len(gb))
+                                and _NUMBERS.findall(title) == _NUMBERS.findall(keys[j])
+                            ):
+                                parent[find(i)] = find(j)
+                        postings[bigram].append(i)
+
+            clusters: Dict[int, List[Track]] = {}
+            for i, title in enumerate(keys):
+                clusters.setdefault(find(i), []).extend(block[title])
+            for members in clusters.values():
+                if len(members) > 1:
+                    # Остаётся самый полный трек, при равенстве — самый ранний.
+                    members.sort(key=lambda t: (t.rating is None, -len(t.notes), t.track_id))
+                    groups.append(members)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    groups.sort(key=lambda g: g[0].track_id)
+    return groups
+
+
+def merge_duplicate_tracks(catalog: Catalog, groups: List[List[Track]]) -> int:
+    """Сливает каждую группу в её первый трек и убирает остальные из каталога."""
+    dropped: Set[int] = set()
+    for keep, *others in groups:
+        members = [keep, *others]
+        ratings = [t.rating for t in members if t.rating]
+        keep.rating = max(ratings) if ratings else None
+        keep.notes = "; ".join(dict.fromkeys(t.notes for t in members if t.notes))
+        keep.year = keep.year or next((t.year for t in others if t.year), None)
+        keep.genre = keep.genre or next((t.genre for t in others if t.genre), "")
+        dropped.update(t.track_id for t in others)
+    for track_id in dropped:
+        catalog.remove(track_id)
+    return len(dropped)
+
+
+def _report_block(track: Track) -> str:
+    fields = [
+        f"ID: {track.track_id}",
+        f"Название: {track.title}",
+        f"Исполнитель: {track.artist}",
+        f"Альбом: {track.album}" if track.album else "",
+        f"Жанр: {track.genre}" if track.genre else "",
+        f"Год: {track.year}" if track.year else "",
+        f"Оценка: {track.rating}/5" if track.rating else "",
+        f"Заметки: {track.notes}" if track.notes else "",
+    ]
+    return "\n".join(field for field in fields if field) + "\n" + "-" * 40 + "\n"
+
+
+def _export_writer(file: TextIO, fmt: str) -> Callable[[Track], None]:
+    """Функция, дописывающая один трек в файл в нужном формате."""
+    if fmt == "csv":
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(["track_id", "title", "artist", "album", "genre", "year", "rating", "notes"])
+        return lambda t: writer.writerow(
+            [t.track_id, t.title, t.artist, t.album, t.genre, t.year or "", t.rating or "", t.notes]
+        )
+    if fmt == "jsonl":
+        # asdict копирует поля рекурсивно и заметно медленнее явного словаря.
+        return lambda t: file.write(json.dumps(
+            {"track_id": t.track_id, "title": t.title, "artist": t.artist, "album": t.album,
+             "genre": t.genre, "year": t.year, "rating": t.rating, "notes": t.notes},
+            ensure_ascii=False,
+        ) + "\n")
+    return lambda t: file.write(_report_block(t))
+
+
+def export_tracks(
+    tracks: List[Track],
+    path: Path,
+    fmt: str,
+    progress: Optional[Callable[[int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> bool:
+    """Потоковая выгрузка: треки пишутся по одному через буферизованный файл.
+
+    Запись идёт во временный файл, который по окончании заменяет path; при
+    отмене он удаляется, и прежний отчёт остаётся нетронутым. Возвращает
+    False, если выгрузку отменили.
+    """
+    temp_path = path.with_name(path.name + ".tmp")
+    try:
+        with temp_path.open("w", encoding="utf-8", newline="", buffering=EXPORT_BUFFER) as file:
+            if fmt == "txt" and not tracks:
+                file.write("Каталог пуст.")
+            write = _export_writer(file, fmt)
+            for done, track in enumerate(tracks, start=1):
+                write(track)
+                if done % EXPORT_PROGRESS_EVERY == 0:
+                    if cancel is not None and cancel.is_set():
+                        raise InterruptedError
+                    if progress is not None:
+                        progress(done)
+    except InterruptedError:
+        temp_path.unlink(missing_ok=True)
+        return False
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    os.replace(temp_path, path)
+    if progress is not None:
+        progress(len(tracks))
+    return True
 
 
 class MelomaniacApp(tk.Tk):
@@ -71,16 +511,43 @@ class MelomaniacApp(tk.Tk):
         self.geometry("1100x640")
         self.minsize(900, 550)
 
-        self.catalog: List[Track] = load_catalog()
-        self.current_view: List[Track] = list(self.catalog)
+        # Каталог читается в фоновом потоке и появляется на экране пачками;
+        # до конца загрузки изменения (и запись на диск) запрещены.
+        self.catalog = Catalog()
+        self.current_view: List[Track] = []
+        self.loading = True
+        self._load_queue: "queue.Queue[Tuple[str, object, float]]" = queue.Queue()
+        self.progress: ttk.Progressbar
         self.entries: Dict[str, tk.Entry] = {}
         self.notes_text: tk.Text
         self.tree: ttk.Treeview
         self.search_var = tk.StringVar()
         self.genre_var = tk.StringVar()
+        self.status_var = tk.StringVar()
+        self.writer = CatalogWriter()
+        # Виртуальный список: в Treeview лежат только строки current_view[start:end]
+        # (видимая область плюс VIEW_BUFFER с каждой стороны), полоса прокрутки
+        # показывает положение во всём current_view.
+        self.scrollbar: ttk.Scrollbar
+        self._window = (0, 0)
+        self._top = 0
+        self._visible = 30
+        self._rewindow_pending = False
+        self._selected_id: Optional[int] = None
+        # Живой поиск: ключи поиска считаются один раз на трек; прошлый запрос
+        # и его результат позволяют сужать выборку, пока запрос дописывается.
+        self._search_keys: Dict[int, Tuple[str, str]] = {}
+        self._last_filter: Optional[Tuple[str, str]] = None
+        self._search_job: Optional[str] = None
 
         self._build_layout()
         self.refresh_tree()
+        self.search_var.trace_add("write", self._schedule_search)
+        self.genre_var.trace_add("write", self._schedule_search)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(STATUS_POLL_MS, self._poll_writer)
+        threading.Thread(target=self._load_worker, name="catalog-loader", daemon=True).start()
+        self.after(LOAD_POLL_MS, self._poll_loader)
 
     def _build_layout(self) -> None:
         self.columnconfigure(0, weight=1)
@@ -89,6 +556,12 @@ class MelomaniacApp(tk.Tk):
         self._build_form_section()
         self._build_list_section()
         self._build_action_section()
+        status_frame = ttk.Frame(self)
+        status_frame.grid(row=3, column=0, sticky="ew", padx=12, pady=(0, 6))
+        status_frame.columnconfigure(0, weight=1)
+        ttk.Label(status_frame, textvariable=self.status_var, anchor="w").grid(row=0, column=0, sticky="ew")
+        self.progress = ttk.Progressbar(status_frame, orient="horizontal", length=200, mode="determinate", maximum=1.0)
+        self.progress.grid(row=0, column=1, sticky="e")
 
     def _build_form_section(self) -> None:
         form_frame = ttk.LabelFrame(self, text="Добавление трека")
@@ -157,15 +630,16 @@ class MelomaniacApp(tk.Tk):
             self.tree.column(col, width=120, anchor="w")
         self.tree.column("notes", width=200)
 
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self._on_scrollbar)
+        self.tree.configure(yscrollcommand=self._on_tree_yview)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
         self.tree.grid(row=1, column=0, sticky="nsew")
-        scrollbar.grid(row=1, column=1, sticky="ns")
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
 
     def _build_action_section(self) -> None:
         actions_frame = ttk.Frame(self)
         actions_frame.grid(row=2, column=0, sticky="ew", padx=12, pady=8)
-        actions_frame.columnconfigure((0, 1, 2, 3), weight=1, uniform="act")
+        actions_frame.columnconfigure((0, 1, 2, 3, 4), weight=1, uniform="act")
 
         ttk.Button(actions_frame, text="Удалить выбранный", command=self.delete_track).grid(
             row=0, column=0, sticky="ew", padx=4
@@ -179,28 +653,194 @@ class MelomaniacApp(tk.Tk):
         ttk.Button(actions_frame, text="Экспорт отчета", command=self.export_summary).grid(
             row=0, column=3, sticky="ew", padx=4
         )
+        ttk.Button(actions_frame, text="Найти дубликаты", command=self.find_duplicates).grid(
+            row=0, column=4, sticky="ew", padx=4
+        )
+
+    def save(self) -> None:
+        self.writer.schedule(self.catalog)
+
+    def _poll_writer(self) -> None:
+        state, error = self.writer.poll_status()
+        if state in ("pending", "saving"):
+            self.status_var.set("Сохранение…")
+        elif state == "saved":
+            self.status_var.set(f"Сохранено в {time.strftime('%H:%M:%S')}")
+        elif state == "error":
+            self.status_var.set(f"Ошибка сохранения: {error}")
+        self.after(STATUS_POLL_MS, self._poll_writer)
 
-    def refresh_tree(self, data: Optional[List[Track]] = None) -> None:
-        dataset = data if data is not None else self.current_view
+    def _load_worker(self) -> None:
+        # Фоновый поток: только разбор файла, виджеты не трогает.
+        stream = CatalogStream(CATALOG_FILE)
+        try:
+            for batch in stream.batches():
+                self._load_queue.put(("batch", batch, stream.consumed / stream.size))
+        except (ValueError, OSError) as exc:
+            self._load_queue.put(("error", str(exc), 1.0))
+        else:
+            self._load_queue.put(("done", stream.next_id, 1.0))
+
+    def _poll_loader(self) -> None:
+        # За один заход разбираем очередь не дольше кадра, чтобы окно не подвисало.
+        deadline = time.perf_counter() + 0.02
+        while time.perf_counter() < deadline:
+            try:
+                kind, payload, progress = self._load_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.progress["value"] = progress
+            if kind == "batch":
+                self._append_to_view(self.catalog.extend(payload))
+                self.status_var.set(f"Загрузка каталога: {len(self.catalog)} трек(ов)…")
+                continue
+            self.loading = False
+            self.progress.grid_remove()
+            if kind == "done":
+                self.catalog.next_id = max(self.catalog.next_id, payload)
+                self.status_var.set(f"Загружено {len(self.catalog)} трек(ов).")
+            else:
+                self.status_var.set(f"Каталог загружен не полностью: {payload}")
+                messagebox.showwarning("Ошибка", f"Не удалось дочитать каталог: {payload}")
+            return
+        self.after(LOAD_POLL_MS, self._poll_loader)
+
+    def _append_to_view(self, tracks: List[Track]) -> None:
+        if self._last_filter is not None and any(self._last_filter):
+            tracks = self._filter(tracks, *self._last_filter)
+        self.current_view.extend(tracks)
+        # Окно ещё не заполнено — дорисовываем; иначе хватит полосы прокрутки.
+        if self._window[1] < min(len(self.current_view), self._top + self._visible + VIEW_BUFFER):
+            self._render_window(self._top)
+        else:
+            self._update_scrollbar()
+
+    def _ensure_loaded(self) -> bool:
+        if self.loading:
+            messagebox.showinfo("Подождите", "Каталог ещё загружается.")
+            return False
+        return True
+
+    def on_close(self) -> None:
+        self.status_var.set("Сохранение…")
+        self.update_idletasks()
+        self.writer.close()
+        state, error = self.writer.poll_status()
+        if state == "error":
+            messagebox.showerror("Ошибка", f"Не удалось сохранить каталог: {error}")
+        self.destroy()
+
+    @staticmethod
+    def _row_values(track: Track) -> tuple:
+        return (
+            track.title,
+            track.artist,
+            track.album,
+            track.genre,
+            track.year or "",
+            track.rating or "",
+            track.notes,
+        )
+
+    def refresh_tree(self, data: Optional[List[Track]] = None, keep_position: bool = False) -> None:
+        if data is not None:
+            self.current_view = data
+        if not keep_position:
+            self._selected_id = None
+        self._render_window(self._top if keep_position else 0)
+
+    def _render_window(self, top: int) -> None:
+        """Материализует строки вокруг top; остальная выборка в дереве не лежит."""
+        total = len(self.current_view)
+        top = max(0, min(top, total - self._visible))
+        start = max(0, top - VIEW_BUFFER)
+        end = min(total, top + self._visible + VIEW_BUFFER)
+        self._top, self._window = top, (start, end)
         self.tree.delete(*self.tree.get_children())
-        for track in dataset:
-            values = (
-                track.title,
-                track.artist,
-                track.album,
-                track.genre,
-                track.year or "",
-                track.rating or "",
-                track.notes,
-            )
-            self.tree.insert("", "end", iid=str(track.track_id), values=values)
+        for track in self.current_view[start:end]:
+            self.tree.insert("", "end", iid=str(track.track_id), values=self._row_values(track))
+        if end > start:
+            self.tree.yview_moveto((top - start) / (end - start))
+        selected = str(self._selected_id)
+        if self._selected_id is not None and self.tree.exists(selected):
+            self.tree.selection_set(selected)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self) -> None:
+        total = len(self.current_view)
+        if not total:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(self._top / total, min(1.0, (self._top + self._visible) / total))
+
+    def _on_tree_yview(self, first: str, last: str) -> None:
+        # Дерево прокрутилось само (колесо, клавиши) — пересчитываем положение
+        # в выборке и, если подошли к краю окна, сдвигаем окно.
+        start, end = self._window
+        count = end - start
+        if not count:
+            self._update_scrollbar()
+            return
+        self._top = start + round(float(first) * count)
+        self._visible = max(1, round((float(last) - float(first)) * count))
+        self._update_scrollbar()
+        margin = VIEW_BUFFER // 4
+        near_start = start > 0 and self._top - start < margin
+        near_end = end < len(self.current_view) and end - (self._top + self._visible) < margin
+        if (near_start or near_end) and not self._rewindow_pending:
+            self._rewindow_pending = True
+            self.after_idle(self._rewindow)
+
+    def _rewindow(self) -> None:
+        self._rewindow_pending = False
+        self._render_window(self._top)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str = "") -> None:
+        if action == "moveto":
+            top = int(float(amount) * len(self.current_view))
+        elif unit == "pages":
+            top = self._top + int(amount) * self._visible
+        else:
+            top = self._top + int(amount)
+        start, end = self._window
+        if start <= top and top + self._visible <= end and (start == 0 or top - start >= VIEW_BUFFER // 4):
+            self.tree.yview_moveto((top - start) / (end - start))
+        else:
+            self._render_window(top)
+
+    def _on_select(self, _event: tk.Event) -> None:
+        selection = self.tree.selection()
+        if selection:
+            self._selected_id = int(selection[0])
+
+    def _update_row(self, track: Track) -> None:
+        """Точечное обновление: перерисовывается одна строка, если она материализована."""
+        iid = str(track.track_id)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self._row_values(track))
+
+    def _drop_from_view(self, track: Track) -> None:
+        # Выбранный трек почти всегда в материализованном окне — ищем сначала там.
+        start, end = self._window
+        view = self.current_view
+        for indexes in (range(start, min(end, len(view))), range(len(view))):
+            for i in indexes:
+                if view[i] is track:
+                    del view[i]
+                    return
+
+    def _selected_track(self) -> Optional[Track]:
+        # Выбранная строка могла уйти из материализованного окна — ищем по id.
+        return self.catalog.get(self._selected_id)
 
     def add_track(self) -> None:
+        if not self._ensure_loaded():
+            return
         track = self._build_track_from_form()
         if not track:
             return
-        self.catalog.append(track)
-        save_catalog(self.catalog)
+        self.catalog.add(track)
+        self.save()
         self.reset_filters()
         self.reset_form()
         messagebox.showinfo("Готово", f"Трек «{track.title}» добавлен.")
@@ -233,7 +873,7 @@ class MelomaniacApp(tk.Tk):
             return None
 
         return Track(
-            track_id=next_track_id(self.catalog),
+            track_id=self.catalog.allocate_id(),
             title=title,
             artist=artist,
             album=album,
@@ -249,29 +889,32 @@ class MelomaniacApp(tk.Tk):
         self.notes_text.delete("1.0", "end")
 
     def delete_track(self) -> None:
-        selection = self.tree.selection()
-        if not selection:
+        if not self._ensure_loaded():
+            return
+        if self._selected_id is None:
             messagebox.showinfo("Нет выбора", "Сначала выберите трек в списке.")
             return
-        track_id = int(selection[0])
-        track = next((t for t in self.catalog if t.track_id == track_id), None)
+        track = self._selected_track()
         if not track:
             messagebox.showwarning("Ошибка", "Не удалось найти трек в каталоге.")
             return
         if not messagebox.askyesno("Подтверждение", f"Удалить «{track.title}»?"):
             return
-        self.catalog.remove(track)
-        save_catalog(self.catalog)
-        self.reset_filters()
+        self.catalog.remove(track.track_id)
+        self._forget_search_keys([track])
+        self._drop_from_view(track)
+        self.save()
+        self._selected_id = None
+        self.refresh_tree(keep_position=True)
         messagebox.showinfo("Готово", "Трек удален.")
 
     def update_rating(self) -> None:
-        selection = self.tree.selection()
-        if not selection:
+        if not self._ensure_loaded():
+            return
+        if self._selected_id is None:
             messagebox.showinfo("Нет выбора", "Сначала выберите трек.")
             return
-        track_id = int(selection[0])
-        track = next((t for t in self.catalog if t.track_id == track_id), None)
+        track = self._selected_track()
         if not track:
             messagebox.showwarning("Ошибка", "Не удалось найти трек.")
             return
@@ -287,42 +930,69 @@ class MelomaniacApp(tk.Tk):
             return
 
         track.rating = None if new_rating == 0 else new_rating
-        save_catalog(self.catalog)
-        self.refresh_tree()
+        self.save()
+        self._update_row(track)
         messagebox.showinfo("Готово", "Оценка обновлена.")
 
+    def _search_key(self, track: Track) -> Tuple[str, str]:
+        key = self._search_keys.get(track.track_id)
+        if key is None:
+            text = "\n".join((track.title, track.artist, track.album, track.genre)).casefold()
+            key = self._search_keys[track.track_id] = (text, track.genre.casefold())
+        return key
+
+    def _forget_search_keys(self, tracks: List[Track]) -> None:
+        for track in tracks:
+            self._search_keys.pop(track.track_id, None)
+
+    def _schedule_search(self, *_args: object) -> None:
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self.apply_filters)
+
+    def _filter(self, base: Iterable[Track], query: str, genre: str) -> List[Track]:
+        key = self._search_key
+        return [track for track in base if query in key(track)[0] and (not genre or key(track)[1] == genre)]
+
+    def apply_filters(self) -> int:
+        """Поиск и фильтр по жанру одним проходом; возвращает число найденных."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        query = self.search_var.get().strip().casefold()
+        genre = self.genre_var.get().strip().casefold()
+        if (query, genre) == self._last_filter:
+            return len(self.current_view)
+        if not query and not genre:
+            results = list(self.catalog)
+        else:
+            # Запрос дописан к прежнему при том же жанре — всё найденное теперь
+            # лежит внутри прошлого результата, полный каталог смотреть не нужно.
+            last = self._last_filter
+            narrowing = last is not None and last[1] == genre and query.startswith(last[0])
+            results = self._filter(self.current_view if narrowing else self.catalog, query, genre)
+        self._last_filter = (query, genre)
+        self.refresh_tree(results)
+        self.status_var.set(f"Найдено {len(results)} трек(ов).")
+        return len(results)
+
     def search_tracks(self) -> None:
-        query = self.search_var.get().strip().lower()
-        if not query:
+        if not self.search_var.get().strip():
             messagebox.showinfo("Поиск", "Введите ключевое слово.")
             return
-        results = [
-            track
-            for track in self.catalog
-            if query in track.title.lower()
-            or query in track.artist.lower()
-            or query in track.album.lower()
-            or query in track.genre.lower()
-        ]
-        self.current_view = results
-        self.refresh_tree()
-        messagebox.showinfo("Поиск", f"Найдено {len(results)} трек(ов).")
+        messagebox.showinfo("Поиск", f"Найдено {self.apply_filters()} трек(ов).")
 
     def filter_by_genre(self) -> None:
-        genre = self.genre_var.get().strip().lower()
-        if not genre:
+        if not self.genre_var.get().strip():
             messagebox.showinfo("Фильтр", "Укажите жанр.")
             return
-        matches = [track for track in self.catalog if track.genre.lower() == genre]
-        self.current_view = matches
-        self.refresh_tree()
-        messagebox.showinfo("Фильтр", f"Найдено {len(matches)} трек(ов).")
+        messagebox.showinfo("Фильтр", f"Найдено {self.apply_filters()} трек(ов).")
 
     def reset_filters(self) -> None:
         self.search_var.set("")
         self.genre_var.set("")
-        self.current_view = list(self.catalog)
-        self.refresh_tree()
+        self._last_filter = None
+        self.apply_filters()
 
     def show_recommendations(self) -> None:
         rated = [track for track in self.catalog if track.rating]
@@ -333,30 +1003,126 @@ class MelomaniacApp(tk.Tk):
         lines = [f"{idx + 1}. {track.title} — {track.artist} (оценка {track.rating})" for idx, track in enumerate(top)]
         messagebox.showinfo("Рекомендации", "\n".join(lines))
 
+    def find_duplicates(self) -> None:
+        if not self._ensure_loaded():
+            return
+        groups = find_duplicate_tracks(self.catalog)
+        if not groups:
+            messagebox.showinfo("Дубликаты", "Дубликатов не найдено.")
+            return
+        extra = sum(len(group) - 1 for group in groups)
+        lines = [f"Групп: {len(groups)}, лишних треков: {extra}.", ""]
+        for keep, *others in groups[:DUPLICATES_SHOWN]:
+            lines.append(f"«{keep.title}» — {keep.artist}")
+            lines.extend(f"    дубликат: «{t.title}» — {t.artist}" for t in others)
+        if len(groups) > DUPLICATES_SHOWN:
+            lines.append(f"... и ещё групп: {len(groups) - DUPLICATES_SHOWN}")
+        lines.extend(["", "Объединить дубликаты?"])
+        if not messagebox.askyesno("Дубликаты", "\n".join(lines)):
+            return
+        self._forget_search_keys([track for group in groups for track in group])
+        removed = merge_duplicate_tracks(self.catalog, groups)
+        self.save()
+        self.reset_filters()
+        messagebox.showinfo("Готово", f"Удалено дубликатов: {removed}.")
+
     def export_summary(self) -> None:
-        export_file = Path(__file__).with_name("melomaniac_report.txt")
-        if not self.catalog:
-            export_file.write_text("Каталог пуст.", encoding="utf-8")
-        else:
-            lines: List[str] = []
-            for track in self.catalog:
-                lines.append(
-                    "\n".join(
-                        [
-                            f"ID: {track.track_id}",
-                            f"Название: {track.title}",
-                            f"Исполнитель: {track.artist}",
-                            f"Альбом: {track.album}" if track.album else "",
-                            f"Жанр: {track.genre}" if track.genre else "",
-                            f"Год: {track.year}" if track.year else "",
-                            f"Оценка: {track.rating}/5" if track.rating else "",
-                            f"Заметки: {track.notes}" if track.notes else "",
-                        ]
-                    ).strip()
-                )
-                lines.append("-" * 40)
-            export_file.write_text("\n".join(lines), encoding="utf-8")
-        messagebox.showinfo("Готово", f"Отчет сохранен в {export_file.name}.")
+        if not self._ensure_loaded():
+            return
+        ExportDialog(self)
+
+
+class ExportDialog(tk.Toplevel):
+    """Выгрузка каталога или текущей выборки в фоновом потоке с прогрессом и отменой."""
+
+    def __init__(self, app: MelomaniacApp) -> None:
+        super().__init__(app)
+        self.app = app
+        self.title("Экспорт")
+        self.resizable(False, False)
+        self.transient(app)
+        self.format_var = tk.StringVar(value="txt")
+        self.scope_var = tk.StringVar(value="view")
+        self.status_var = tk.StringVar()
+        self._cancel = threading.Event()
+        self._done = 0  # пишет поток выгрузки, читает поток Tk
+        self._total = 0
+        self._result: Optional[Tuple[str, str]] = None
+        self._thread: Optional[threading.Thread] = None
+
+        frame = ttk.Frame(self, padding=12)
+        frame.grid(row=0, column=0, sticky="nsew")
+        ttk.Label(frame, text="Формат:").grid(row=0, column=0, sticky="w")
+        for idx, (fmt, label) in enumerate(EXPORT_FORMATS.items(), start=1):
+            ttk.Radiobutton(frame, text=label, value=fmt, variable=self.format_var).grid(row=0, column=idx, sticky="w", padx=4)
+        ttk.Label(frame, text="Что выгрузить:").grid(row=1, column=0, sticky="w", pady=(6, 0))
+        ttk.Radiobutton(
+            frame, text=f"Текущую выборку ({len(app.current_view)})", value="view", variable=self.scope_var
+        ).grid(row=1, column=1, columnspan=2, sticky="w", padx=4, pady=(6, 0))
+        ttk.Radiobutton(
+            frame, text=f"Весь каталог ({len(app.catalog)})", value="all", variable=self.scope_var
+        ).grid(row=1, column=3, sticky="w", padx=4, pady=(6, 0))
+
+        self.progress = ttk.Progressbar(frame, orient="horizontal", length=360, mode="determinate", maximum=1.0)
+        self.progress.grid(row=2, column=0, columnspan=4, sticky="ew", pady=(10, 4))
+        ttk.Label(frame, textvariable=self.status_var).grid(row=3, column=0, columnspan=4, sticky="w")
+
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=4, column=0, columnspan=4, sticky="e", pady=(8, 0))
+        self.start_button = ttk.Button(buttons, text="Экспортировать", command=self.start)
+        self.start_button.grid(row=0, column=0, padx=4)
+        self.cancel_button = ttk.Button(buttons, text="Отмена", command=self.cancel)
+        self.cancel_button.grid(row=0, column=1, padx=4)
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+    def start(self) -> None:
+        fmt = self.format_var.get()
+        # Снимок списка делается здесь, в потоке Tk: дальше выборка может меняться.
+        tracks = list(self.app.current_view if self.scope_var.get() == "view" else self.app.catalog)
+        path = Path(__file__).with_name(f"melomaniac_report.{fmt}")
+        self._total = len(tracks)
+        self.start_button.state(["disabled"])
+        self.status_var.set(f"Выгрузка в {path.name}…")
+        self._thread = threading.Thread(target=self._run, args=(tracks, path, fmt), name="export", daemon=True)
+        self._thread.start()
+        self.after(STATUS_POLL_MS, self._poll)
+
+    def _run(self, tracks: List[Track], path: Path, fmt: str) -> None:
+        def progress(done: int) -> None:
+            self._done = done
+
+        result = ("error", "выгрузка прервана")
+        try:
+            finished = export_tracks(tracks, path, fmt, progress, self._cancel)
+            result = ("done", path.name) if finished else ("cancelled", "")
+        except OSError as exc:
+            result = ("error", str(exc))
+        except Exception as exc:
+            result = ("error", f"{type(exc).__name__}: {exc}")
+        finally:
+            # Результат выставляется всегда, иначе _poll будет ждать вечно.
+            self._result = result
+
+    def _poll(self) -> None:
+        self.progress["value"] = self._done / self._total if self._total else 1.0
+        self.status_var.set(f"Выгружено {self._done} из {self._total}…")
+        if self._result is None:
+            self.after(STATUS_POLL_MS, self._poll)
+            return
+        kind, detail = self._result
+        self.destroy()
+        if kind == "done":
+            messagebox.showinfo("Готово", f"Отчет сохранен в {detail}.", parent=self.app)
+        elif kind == "error":
+            messagebox.showerror("Ошибка", f"Не удалось выгрузить: {detail}", parent=self.app)
+
+    def cancel(self) -> None:
+        if self._thread is None:
+            self.destroy()
+            return
+        self._cancel.set()
+        self.cancel_button.state(["disabled"])
+        self.status_var.set("Отмена…")
 
 
 def main() -> None:
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Проверки каталога меломана (PR21): python -m pytest PR21"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+
+def _load_main():
+    # main.py есть в каждой практической, поэтому модуль грузится по пути
+    # под собственным именем, а не через import main.
+    spec = importlib.util.spec_from_file_location("pr21_main", Path(__file__).with_name("main.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+main = _load_main()
+
+TRACK = '{"track_id": 1, "title": "Кукушка", "artist": "Кино", "album": "Чёрный альбом"}'
+
+
+def read_stream(path: Path, chunk_size: int):
+    stream = main.CatalogStream(path, batch_size=2, chunk_size=chunk_size)
+    return [t.track_id for batch in stream.batches() for t in batch], stream.next_id
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 16])
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"a": 1 "b": 2}',
+        '{"a": 1,}',
+        '{,"a": 1}',
+        '{"a" 1}',
+        "{1: 2}",
+        f"[{TRACK} {TRACK}]",
+        f"[{TRACK},]",
+        f"[,{TRACK}]",
+        f"[{TRACK}",
+        f'{{"tracks": [{TRACK}] "next_id": 5}}',
+        "[] x",
+    ],
+)
+def test_stream_rejects_what_json_rejects(tmp_path, text, chunk_size):
+    path = tmp_path / "catalog.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        json.loads(text)
+    with pytest.raises(ValueError):
+        read_stream(path, chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_stream_reads_both_formats(tmp_path, chunk_size):
+    tracks = [json.loads(TRACK) | {"track_id": i} for i in range(1, 6)]
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"next_id": 9, "extra": {"x": [1, 2]}, "tracks": tracks}, ensure_ascii=False), encoding="utf-8")
+    assert read_stream(path, chunk_size) == ([1, 2, 3, 4, 5], 9)
+    path.write_text(json.dumps(tracks, ensure_ascii=False, indent=2), encoding="utf-8")
+    assert read_stream(path, chunk_size) == ([1, 2, 3, 4, 5], 1)
+
+
+def make_track(track_id: int, title: str = "Кукушка", artist: str = "Кино", **fields) -> "main.Track":
+    values = {"album": "", "genre": "", "year": None, "rating": None, "notes": ""} | fields
+    return main.Track(track_id, title, artist, **values)
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    monkeypatch.setattr(main, "CATALOG_FILE", path)
+    return path
+
+
+def test_catalog_keeps_id_counter_after_removal(catalog_file):
+    catalog = main.Catalog([make_track(1), make_track(2)])
+    catalog.remove(2)
+    assert catalog.allocate_id() == 3
+    main.save_catalog(catalog)
+    assert read_stream(catalog_file, 1 << 16) == ([1], 4)
+
+
+def test_writer_coalesces_a_burst_of_edits(catalog_file, monkeypatch):
+    saved = []
+    monkeypatch.setattr(main, "save_catalog", lambda catalog: saved.append(len(catalog)))
+    catalog = main.Catalog()
+    writer = main.CatalogWriter(delay=0.2)
+    for i in range(1, 21):
+        catalog.add(make_track(i))
+        writer.schedule(catalog)
+    writer.close()
+    assert saved == [20]
+    assert writer.poll_status() == ("saved", "")
+    assert writer.poll_status() == ("idle", "")
+
+
+def test_writer_survives_a_failed_save(catalog_file):
+    writer = main.CatalogWriter(delay=0)
+    broken = main.Catalog([make_track(1, notes=object())])  # не сериализуется в JSON
+    writer.schedule(broken)
+    writer.schedule(broken)
+    for _ in range(200):
+        state, error = writer.poll_status()
+        if state == "error":
+            break
+        time.sleep(0.01)
+    assert state == "error" and "TypeError" in error
+    writer.schedule(main.Catalog([make_track(1)]))
+    writer.close()
+    assert read_stream(catalog_file, 1 << 16) == ([1], 2)
+
+
+def test_find_and_merge_duplicate_tracks():
+    catalog = main.Catalog([
+        make_track(1, "Группа крови", "Кино", album="Группа крови", year=1988),
+        make_track(2, "Gruppa krovi", "KINO", album="Gruppa Krovi", rating=5, notes="хит"),
+        make_track(3, "Часть 1", "X"),
+        make_track(4, "Часть 2", "X"),
+        make_track(5, "!!!", "Y"),
+        make_track(6, "???", "Y"),
+    ])
+    groups = main.find_duplicate_tracks(catalog)
+    assert [[t.track_id for t in group] for group in groups] == [[2, 1]]
+    assert main.merge_duplicate_tracks(catalog, groups) == 1
+    kept = catalog.get(2)
+    assert (kept.year, kept.rating, kept.notes) == (1988, 5, "хит")
+    assert 1 not in catalog
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "txt"])
+def test_export_replaces_report_only_when_finished(tmp_path, fmt):
+    path = tmp_path / f"report.{fmt}"
+    path.write_text("старый отчёт", encoding="utf-8")
+    tracks = [make_track(i) for i in range(1, main.EXPORT_PROGRESS_EVERY * 3)]
+    cancel = main.threading.Event()
+    cancel.set()
+    assert not main.export_tracks(tracks, path, fmt, cancel=cancel)
+    assert path.read_text(encoding="utf-8") == "старый отчёт"
+    assert not path.with_name(path.name + ".tmp").exists()
+
+    done = []
+    assert main.export_tracks(tracks, path, fmt, progress=done.append)
+    assert done[-1] == len(tracks)
+    if fmt == "jsonl":
+        assert [json.loads(line)["track_id"] for line in path.read_text(encoding="utf-8").splitlines()] == [
+            t.track_id for t in tracks
+        ]
+
+
+def test_export_dialog_reports_unexpected_errors(tmp_path, monkeypatch):
+    def fail(*args):
+        raise KeyError("boom")
+
+    monkeypatch.setattr(main, "export_tracks", fail)
+    dialog = main.ExportDialog.__new__(main.ExportDialog)  # без окна Tk: проверяется только поток
+    dialog._done, dialog._cancel, dialog._result = 0, main.threading.Event(), None
+    dialog._run([], tmp_path / "report.txt", "txt")
+    assert dialog._result == ("error", "KeyError: 'boom'")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Замер подсказок «Возможно, вы имели в виду» на синтетическом каталоге.
+
+Два набора: имена из общего набора слогов (много общих триграмм) и имена
+с общим началом «The …». Запросы — имена каталога с одной опечаткой.
+Печатается среднее и 99-й перцентиль времени ArtistIndex.suggest и доля
+запросов, для которых исходный исполнитель попал в подсказки.
+
+Запуск: python bench_suggest.py --n 30000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+# main.py при импорте открывает базу и создаёт бота: база — во временном файле.
+os.environ.setdefault("MUSIC_DB_PATH", str(Path(tempfile.mkdtemp()) / "bench.sqlite3"))
+os.environ.setdefault("TELEGRAM_TOKEN", "0:bench")
+
+from main import ArtistIndex  # noqa: E402
+
+SYLLABLES = ["ка", "ро", "ми", "ла", "то", "ве", "ну", "зо", "ры", "ше", "ba", "di", "mo", "ne", "ri", "so"]
+LETTERS = "абвгдежзиклмнопрстуabcdefghiklmnoprstu"
+
+
+def make_names(n: int, prefix: str, rnd: random.Random) -> List[str]:
+    def word() -> str:
+        return "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+
+    names = {f"{prefix}{word().title()} {word().title()}" for _ in range(n)}
+    return sorted(names)
+
+
+def typo(name: str, rnd: random.Random) -> str:
+    chars = list(name)
+    pos = rnd.randrange(len(chars))
+    if rnd.random() < 0.5:
+        chars[pos] = rnd.choice(LETTERS)
+    else:
+        chars.insert(pos, rnd.choice(LETTERS))
+    return "".join(chars)
+
+
+def run(names: List[str], queries: int, rnd: random.Random) -> Tuple[float, float, float]:
+    index = ArtistIndex((str(i), name, []) for i, name in enumerate(names))
+    sample = [(str(i), typo(names[i], rnd)) for i in rnd.sample(range(len(names)), min(queries, len(names)))]
+    timings: List[float] = []
+    found = 0
+    for key, query in sample:
+        t0 = time.perf_counter()
+        keys = index.suggest(query)
+        timings.append(time.perf_counter() - t0)
+        found += key in keys
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return mean * 1000, timings[int(len(timings) * 0.99)] * 1000, found / len(sample)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер подсказок по опечаткам.")
+    parser.add_argument("--n", type=int, default=30_000, help="число исполнителей")
+    parser.add_argument("--queries", type=int, default=2000, help="число запросов")
+    args = parser.parse_args()
+
+    rnd = random.Random(5)
+    for title, prefix, n in (("слоги", "", args.n), ("общее начало", "The ", max(1, args.n // 10))):
+        names = make_names(n, prefix, rnd)
+        mean, p99, recall = run(names, args.queries, rnd)
+        print(f"{title}: исполнителей {len(names)}, среднее {mean:.3f} мс, "
+              f"99% {p99:.3f} мс, исходное имя в подсказках: {recall:.1%}")
+
+
+if __name__ == "__main__":
+    main()
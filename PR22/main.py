@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import html
+import json
+import math
 import os
 import random
+import re
+import sqlite3
 import textwrap
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 
 import telebot
+from telebot.apihelper import ApiTelegramException
 from telebot.util import extract_arguments
 
 
@@ -24,11 +35,53 @@ def _load_token() -> str:
     )
 
 
-MUSIC_DB: Dict[str, Dict[str, List[str] | str]] = {
-    "queen": {
-        "name": "Queen",
+Artist = Dict[str, List[str] | str]
+
+DB_PATH = Path(os.getenv("MUSIC_DB_PATH") or Path(__file__).with_name("music_db.sqlite3"))
+ARTIST_CACHE_SIZE = 256  # сколько полных карточек держать в памяти
+RELOAD_CHECK_INTERVAL = 2.0  # секунд между проверками файла базы
+TOP_ALBUMS = 5  # сколько альбомов показывать в карточке
+
+# Каталог — таблица entries справочника меломана из PR20 (одна строка на
+# альбом): бот может читать ту же базу, что ведёт PR20 с --storage sqlite.
+# Схема ниже совпадает с SQLITE_SCHEMA из PR20 и нужна только для новой
+# пустой базы; в существующую базу бот ничего не пишет.
+ENTRIES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    rating INTEGER,
+    notes TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_artist ON entries(artist);
+"""
+
+# Необязательные сведения для карточек, которых нет в справочнике:
+# псевдонимы, треки, описание и факты. Ключ — имя исполнителя из entries,
+# списки хранятся как JSON-текст.
+ARTIST_INFO_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artist_info (
+    artist TEXT PRIMARY KEY,
+    aliases TEXT NOT NULL DEFAULT '[]',
+    top_tracks TEXT NOT NULL DEFAULT '[]',
+    description TEXT NOT NULL DEFAULT '',
+    facts TEXT NOT NULL DEFAULT '[]'
+);
+"""
+
+# Стартовое наполнение для новой базы: альбомы уходят в entries, остальное —
+# в artist_info.
+SAMPLE_ARTISTS: Dict[str, Artist] = {
+    "Queen": {
         "aliases": ["queen", "freddie", "mercury", "квин", "фредди"],
-        "genres": ["классический рок", "глэм-рок"],
+        "albums": [
+            ("A Night at the Opera", "классический рок", 1975, 10),
+            ("News of the World", "глэм-рок", 1977, 9),
+        ],
         "top_tracks": ["Bohemian Rhapsody", "Don't Stop Me Now", "Somebody to Love"],
         "description": (
             "Британская группа с театральными шоу, многоголосием и культовым голосом "
@@ -39,10 +92,13 @@ MUSIC_DB: Dict[str, Dict[str, List[str] | str]] = {
             "A Night at the Opera был самым дорогим британским альбомом своего времени.",
         ],
     },
-    "pink_floyd": {
-        "name": "Pink Floyd",
+    "Pink Floyd": {
         "aliases": ["pink", "pink floyd", "пинк флойд"],
-        "genres": ["психоделический рок", "прогрессивный рок"],
+        "albums": [
+            ("The Dark Side of the Moon", "прогрессивный рок", 1973, 10),
+            ("Wish You Were Here", "прогрессивный рок", 1975, 9),
+            ("The Piper at the Gates of Dawn", "психоделический рок", 1967, 8),
+        ],
         "top_tracks": ["Time", "Wish You Were Here", "Comfortably Numb"],
         "description": (
             "Лондонский коллектив, популяризировавший концептуальные альбомы и "
@@ -53,10 +109,12 @@ MUSIC_DB: Dict[str, Dict[str, List[str] | str]] = {
             "Тур The Wall включал пенопластовую стену высотой 12 метров, рушащуюся в финале.",
         ],
     },
-    "daft_punk": {
-        "name": "Daft Punk",
+    "Daft Punk": {
         "aliases": ["daft punk", "daft", "дафт панк"],
-        "genres": ["френч-хаус", "электроника"],
+        "albums": [
+            ("Discovery", "френч-хаус", 2001, 10),
+            ("Random Access Memories", "электроника", 2013, 9),
+        ],
         "top_tracks": ["One More Time", "Around the World", "Get Lucky"],
         "description": (
             "Французский дуэт, задавший звучание французского хауса; известен робот-шлемами "
@@ -67,10 +125,13 @@ MUSIC_DB: Dict[str, Dict[str, List[str] | str]] = {
             "На шоу Alive 2007 музыканты выступали на пирамиде высотой около семи метров.",
         ],
     },
-    "nina_simone": {
-        "name": "Нина Симон",
+    "Нина Симон": {
         "aliases": ["nina", "simone", "нина", "саймон", "нина симон"],
-        "genres": ["джаз", "соул", "блюз"],
+        "albums": [
+            ("Little Girl Blue", "джаз", 1959, 9),
+            ("Wild Is the Wind", "соул", 1966, 8),
+            ("Pastel Blues", "блюз", 1965, 8),
+        ],
         "top_tracks": ["Sinnerman", "Feeling Good", "I Put a Spell on You"],
         "description": (
             "Американская певица и пианистка, сочетавшая джаз, госпел и академическую школу; "
@@ -81,10 +142,13 @@ MUSIC_DB: Dict[str, Dict[str, List[str] | str]] = {
             "Её версия «Feeling Good» стала стандартом и часто звучит в кино и рекламе.",
         ],
     },
-    "kino": {
-        "name": "Кино (Виктор Цой)",
+    "Кино (Виктор Цой)": {
         "aliases": ["kino", "victor tsoi", "tsoi", "кино", "цой"],
-        "genres": ["постпанк", "нью-вейв"],
+        "albums": [
+            ("Группа крови", "постпанк", 1988, 10),
+            ("Звезда по имени Солнце", "нью-вейв", 1989, 9),
+            ("Чёрный альбом", "постпанк", 1990, 9),
+        ],
         "top_tracks": ["Группа крови", "Перемен", "Звезда по имени Солнце"],
         "description": (
             "Легендарная советская рок-группа, ставшая голосом конца 1980-х и символом перемен."
@@ -96,35 +160,322 @@ MUSIC_DB: Dict[str, Dict[str, List[str] | str]] = {
     },
 }
 
+SUGGEST_LIMIT = 3
+SUGGEST_THRESHOLD = 0.45  # минимальная доля общих триграмм (коэффициент Дайса)
+SUGGEST_MAX_POSTING = 1000  # триграммы, которые есть у большего числа псевдонимов, не индексируются
+SUGGEST_SCAN_LIMIT = 1500  # после стольких просмотренных записей списков следующие триграммы не обходятся
+SUGGEST_CANDIDATES = 32  # сколько кандидатов с наибольшим числом общих триграмм оценивать точно
+PAGE_SIZE = 50  # строк на странице /artists и /genres
+PAGE_CHARS = 3500  # запас до лимита Telegram в 4096 символов
+
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.strip().lower().replace("ё", "е"))
+
+
+def _trigrams(text: str) -> set[str]:
+    # Пробелы по краям дают триграммы начала и конца слова, поэтому
+    # короткие имена вроде «цой» тоже находятся с опечаткой.
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ArtistIndex:
+    """Поиск исполнителя по имени и псевдонимам.
+
+    Словарь псевдоним → ключ строится один раз, поэтому точное совпадение
+    ищется за O(1). Для опечаток есть триграммный индекс: кандидаты берутся
+    из списков самых редких триграмм запроса и ранжируются по коэффициенту Дайса.
+
+    Списки триграмм отсортированы по числу триграмм псевдонима, так что
+    фильтр по длине — два bisect. Слишком частые триграммы (общее «The …»)
+    не индексируются, списки обходятся до SUGGEST_SCAN_LIMIT записей, а точно
+    оцениваются не больше SUGGEST_CANDIDATES кандидатов. Поэтому поиск
+    приблизительный: псевдоним, похожий на запрос
+    только частыми триграммами, может не попасть в подсказки.
+    """
+
+    def __init__(self, artists: Iterable[Tuple[str, str, List[str]]]) -> None:
+        self.aliases: Dict[str, str] = {}
+        for key, name, aliases in artists:
+            for alias in (name, *aliases):
+                self.aliases.setdefault(_normalize(alias), key)
+        self.grams: Dict[str, set[str]] = {alias: _trigrams(alias) for alias in self.aliases}
+        postings: Dict[str, List[str]] = {}
+        for alias, grams in sorted(self.grams.items(), key=lambda item: len(item[1])):
+            for gram in grams:
+                postings.setdefault(gram, []).append(alias)
+        self.postings = {gram: aliases for gram, aliases in postings.items() if len(aliases) <= SUGGEST_MAX_POSTING}
+        # Параллельно спискам — длины псевдонимов в триграммах, для bisect.
+        self.sizes = {gram: [len(self.grams[alias]) for alias in aliases] for gram, aliases in self.postings.items()}
+
+    def resolve(self, query: str) -> str | None:
+        return self.aliases.get(_normalize(query))
+
+    def suggest(self, query: str, limit: int = SUGGEST_LIMIT) -> List[str]:
+        """Ключи исполнителей, похожих на query, от самого близкого."""
+        grams = _trigrams(_normalize(query))
+        size = len(grams)
+        # Дайс не больше 2·min(a, b)/(a + b), отсюда допустимые длины
+        # псевдонима: a·t/(2 − t) ≤ b ≤ a·(2 − t)/t.
+        low = math.ceil(size * SUGGEST_THRESHOLD / (2 - SUGGEST_THRESHOLD) - 1e-9)
+        high = math.floor(size * (2 - SUGGEST_THRESHOLD) / SUGGEST_THRESHOLD + 1e-9)
+        # Похожему псевдониму нужно не меньше low общих триграмм, значит он
+        # встретится среди size - low + 1 самых редких из них —
+        # частые триграммы с длинными списками можно не обходить.
+        rare = sorted((gram for gram in grams if gram in self.postings), key=lambda gram: len(self.postings[gram]))
+        counts: Counter[str] = Counter()
+        scanned = 0
+        for gram in rare[:size - low + 1]:
+            if scanned >= SUGGEST_SCAN_LIMIT:
+                break
+            sizes = self.sizes[gram]
+            matches = self.postings[gram][bisect_left(sizes, low):bisect_right(sizes, high)]
+            counts.update(matches)
+            scanned += len(matches)
+        scored: List[Tuple[float, str]] = []
+        # sorted быстрее most_common: вся работа внутри C, без heapq на Python.
+        for alias, _ in sorted(counts.items(), key=itemgetter(1), reverse=True)[:SUGGEST_CANDIDATES]:
+            alias_grams = self.grams[alias]
+            score = 2 * len(grams & alias_grams) / (len(grams) + len(alias_grams))
+            if score >= SUGGEST_THRESHOLD:
+                scored.append((score, alias))
+        scored.sort(reverse=True)
+        keys: List[str] = []
+        for _, alias in scored:
+            key = self.aliases[alias]
+            if key not in keys:
+                keys.append(key)
+                if len(keys) == limit:
+                    break
+        return keys
+
+
+def _html(text: str) -> str:
+    # Кавычки в тексте сообщения экранировать не нужно, только разметку.
+    return html.escape(text, quote=False)
+
+
+def _format_artist_card(artist: Artist) -> str:
+    albums = ", ".join(map(_html, artist["albums"])) or "-"
+    top_tracks = ", ".join(map(_html, artist["top_tracks"])) or "-"
+    genres = ", ".join(map(_html, artist["genres"])) or "-"
+    facts = "\n".join(f"- {_html(fact)}" for fact in artist["facts"]) or "-"
+    return "\n".join([
+        f"<b>{_html(artist['name'])}</b>",
+        f"Жанры: {genres}",
+        f"Альбомы: {albums}",
+        f"Ключевые треки: {top_tracks}",
+        "",
+        _html(artist["description"]),
+        "",
+        "Интересные факты:",
+        facts,
+    ])
+
+
+def _paginate(items: List[str], separator: str) -> List[str]:
+    """Режет отсортированный список на страницы по PAGE_SIZE строк и PAGE_CHARS символов."""
+    pages: List[str] = []
+    page: List[str] = []
+    size = 0
+    for item in items:
+        if page and (len(page) == PAGE_SIZE or size + len(separator) + len(item) > PAGE_CHARS):
+            pages.append(separator.join(page))
+            page, size = [], 0
+        size += len(item) + (len(separator) if page else 0)
+        page.append(item)
+    pages.append(separator.join(page) or "-")
+    return pages
+
+
+class ArtistStore:
+    """Каталог исполнителей поверх таблицы entries справочника из PR20.
+
+    Исполнитель — это группа строк entries с одинаковым artist; ключом
+    служит само имя. При открытии читаются только пары (исполнитель, жанр)
+    и псевдонимы из artist_info — их хватает для ArtistIndex и готовых
+    страниц /artists и /genres. Карточка собирается из альбомов исполнителя
+    по запросу и держится в LRU-кэше уже отрисованной. refresh() замечает
+    правки базы другим процессом (например, самим PR20) или замену файла
+    целиком и пересобирает индекс, не останавливая бота.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.conn: sqlite3.Connection | None = None
+        # Обработчики telebot выполняются в пуле потоков.
+        self._lock = threading.RLock()
+        self._cache: OrderedDict[str, Tuple[Artist, str]] = OrderedDict()
+        self._open()
+
+    def _open(self) -> None:
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+            # Режим журнала не меняется: бот только читает, а заменённый файл
+            # не должен подхватить чужой -wal от прежнего соединения.
+            self.conn = conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            if not self._has_table("entries"):
+                _seed(conn)
+            self._has_info = self._has_table("artist_info")
+            self._inode = os.stat(self.path).st_ino
+            self._load_index()
+
+    def _has_table(self, name: str) -> bool:
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+        return self.conn.execute(query, (name,)).fetchone() is not None
+
+    def _load_index(self) -> None:
+        self._version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        rows = self.conn.execute("SELECT DISTINCT artist, genre FROM entries").fetchall()
+        aliases: Dict[str, List[str]] = {}
+        if self._has_info:
+            aliases = {artist: json.loads(raw) for artist, raw in self.conn.execute("SELECT artist, aliases FROM artist_info")}
+        self.names: Dict[str, str] = {artist: artist for artist in sorted({artist for artist, _ in rows})}
+        self.keys = list(self.names)
+        self.index = ArtistIndex((key, key, aliases.get(key, [])) for key in self.keys)
+        self.pages = {
+            "artists": _paginate([f"- {_html(name)}" for name in self.keys], "\n"),
+            "genres": _paginate([_html(genre) for genre in sorted({genre for _, genre in rows})], ", "),
+        }
+        self._cache.clear()
+
+    def refresh(self) -> bool:
+        """Перечитывает индекс, если база изменилась. True — если перечитали."""
+        with self._lock:
+            try:
+                inode = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                return False  # файл как раз заменяют — проверим в следующий раз
+            if inode != self._inode:
+                self._open()
+                return True
+            # data_version меняется, когда в базу коммитит другое соединение.
+            if self.conn.execute("PRAGMA data_version").fetchone()[0] != self._version:
+                self._has_info = self._has_table("artist_info")
+                self._load_index()
+                return True
+        return False
+
+    def _entry(self, key: str) -> Tuple[Artist, str] | None:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry
+            albums = self.conn.execute(
+                "SELECT album, genre, year, notes FROM entries WHERE artist = ? "
+                "ORDER BY COALESCE(rating, 0) DESC, year, id",
+                (key,),
+            ).fetchall()
+            if not albums:
+                return None
+            info = None
+            if self._has_info:
+                info = self.conn.execute(
+                    "SELECT aliases, top_tracks, description, facts FROM artist_info WHERE artist = ?", (key,)
+                ).fetchone()
+            artist = _artist_from_rows(key, albums, info)
+            entry = self._cache[key] = (artist, _format_artist_card(artist))
+            if len(self._cache) > ARTIST_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return entry
+
+    def get(self, key: str) -> Artist | None:
+        entry = self._entry(key)
+        return entry[0] if entry else None
+
+    def card(self, key: str) -> str | None:
+        entry = self._entry(key)
+        return entry[1] if entry else None
+
+
+def _seed(conn: sqlite3.Connection) -> None:
+    """Создаёт в новой базе entries и artist_info и заполняет их SAMPLE_ARTISTS."""
+    created_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    with conn:
+        conn.executescript(ENTRIES_SCHEMA + ARTIST_INFO_SCHEMA)
+        for name, artist in SAMPLE_ARTISTS.items():
+            conn.executemany(
+                "INSERT INTO entries (artist, album, genre, year, rating, notes, created_at) VALUES (?, ?, ?, ?, ?, '', ?)",
+                ((name, album, genre, year, rating, created_at) for album, genre, year, rating in artist["albums"]),
+            )
+            conn.execute(
+                "INSERT INTO artist_info VALUES (?, ?, ?, ?, ?)",
+                (
+                    name,
+                    json.dumps(artist["aliases"], ensure_ascii=False),
+                    json.dumps(artist["top_tracks"], ensure_ascii=False),
+                    artist["description"],
+                    json.dumps(artist["facts"], ensure_ascii=False),
+                ),
+            )
+
+
+def _artist_from_rows(name: str, albums: List[Tuple], info: Tuple[str, ...] | None) -> Artist:
+    # albums уже отсортированы по оценке: первые TOP_ALBUMS — лучшие.
+    aliases, top_tracks, description, facts = ("[]", "[]", "", "[]") if info is None else info
+    years = [year for _, _, year, _ in albums]
+    return {
+        "name": name,
+        "aliases": json.loads(aliases),
+        "genres": list(dict.fromkeys(genre for _, genre, _, _ in albums)),
+        "albums": [f"{album} ({year})" for album, _, year, _ in albums[:TOP_ALBUMS]],
+        "top_tracks": json.loads(top_tracks),
+        "description": description or f"Альбомов в справочнике: {len(albums)}, {min(years)}–{max(years)} гг.",
+        # Заметки к альбомам из справочника идут после фактов из artist_info.
+        "facts": json.loads(facts) + [notes for *_, notes in albums if notes],
+    }
+
+
+def _watch_db() -> None:
+    while True:
+        time.sleep(RELOAD_CHECK_INTERVAL)
+        try:
+            STORE.refresh()
+        except sqlite3.Error as exc:
+            print(f"Не удалось перечитать {STORE.path}: {exc}")
+
+
+STORE = ArtistStore(DB_PATH)
+
 BOT = telebot.TeleBot(_load_token(), parse_mode="HTML")
 
 
-def _format_artist_card(artist: Dict[str, List[str] | str]) -> str:
-    top_tracks = ", ".join(artist["top_tracks"]) or "-"
-    genres = ", ".join(artist["genres"]) or "-"
-    facts = "\n".join(f"- {fact}" for fact in artist["facts"]) or "-"
+def _page_keyboard(kind: str, page: int, total: int) -> telebot.types.InlineKeyboardMarkup | None:
+    if total < 2:
+        return None
+    keyboard = telebot.types.InlineKeyboardMarkup()
+    buttons = []
+    if page > 0:
+        buttons.append(telebot.types.InlineKeyboardButton("◀", callback_data=f"{kind}:{page - 1}"))
+    buttons.append(telebot.types.InlineKeyboardButton(f"{page + 1}/{total}", callback_data="noop"))
+    if page < total - 1:
+        buttons.append(telebot.types.InlineKeyboardButton("▶", callback_data=f"{kind}:{page + 1}"))
+    keyboard.row(*buttons)
+    return keyboard
+
 
-    return textwrap.dedent(
-        f"""
-        <b>{artist['name']}</b>
-        Жанры: {genres}
-        Ключевые треки: {top_tracks}
+def _render_page(kind: str, page: int) -> Tuple[str, telebot.types.InlineKeyboardMarkup | None]:
+    pages = STORE.pages[kind]
+    page = min(max(page, 0), len(pages) - 1)  # после перезагрузки страниц могло стать меньше
+    title = "Исполнители" if kind == "artists" else "Жанры"
+    return f"{title}:\n{pages[page]}", _page_keyboard(kind, page, len(pages))
 
-        {artist['description']}
 
-        Интересные факты:
-        {facts}
-        """
-    ).strip()
+def _resolve_artist(query: str) -> Artist | None:
+    key = STORE.index.resolve(query)
+    return STORE.get(key) if key else None
 
 
-def _resolve_artist(query: str) -> Dict[str, List[str] | str] | None:
-    normalized = query.strip().lower()
-    for artist in MUSIC_DB.values():
-        aliases = [artist["name"].lower(), *artist["aliases"]]
-        if normalized in aliases:
-            return artist
-    return None
+def _not_found(query: str, hint: str) -> str:
+    names = [STORE.names[key] for key in STORE.index.suggest(query) if key in STORE.names]
+    if not names:
+        return hint
+    return "Возможно, вы имели в виду: " + ", ".join(_html(name) for name in names) + "?"
 
 
 @BOT.message_handler(commands=["start", "help"])
@@ -146,14 +497,30 @@ def send_welcome(message: telebot.types.Message) -> None:
 
 @BOT.message_handler(commands=["artists"])
 def list_artists(message: telebot.types.Message) -> None:
-    names = sorted(artist["name"] for artist in MUSIC_DB.values())
-    BOT.reply_to(message, "Исполнители:\n" + "\n".join(f"- {name}" for name in names))
+    text, keyboard = _render_page("artists", 0)
+    BOT.reply_to(message, text, reply_markup=keyboard)
 
 
 @BOT.message_handler(commands=["genres"])
 def list_genres(message: telebot.types.Message) -> None:
-    genres = sorted({genre for artist in MUSIC_DB.values() for genre in artist["genres"]})
-    BOT.reply_to(message, "Жанры:\n" + ", ".join(genres))
+    text, keyboard = _render_page("genres", 0)
+    BOT.reply_to(message, text, reply_markup=keyboard)
+
+
+@BOT.callback_query_handler(func=lambda call: True)
+def turn_page(call: telebot.types.CallbackQuery) -> None:
+    kind, _, page = (call.data or "").partition(":")
+    try:
+        if kind in STORE.pages and page.isdigit():
+            text, keyboard = _render_page(kind, int(page))
+            try:
+                BOT.edit_message_text(text, call.message.chat.id, call.message.message_id, reply_markup=keyboard)
+            except ApiTelegramException as exc:
+                # Страница после ограничения совпала с показанной — править нечего.
+                if "message is not modified" not in str(exc):
+                    raise
+    finally:
+        BOT.answer_callback_query(call.id)  # иначе у кнопки до таймаута крутятся «часики»
 
 
 @BOT.message_handler(commands=["artist"])
@@ -163,12 +530,13 @@ def artist_detail(message: telebot.types.Message) -> None:
         BOT.reply_to(message, "Формат: /artist Queen")
         return
 
-    artist = _resolve_artist(arguments)
-    if not artist:
-        BOT.reply_to(message, "Не нашёл такого исполнителя. Используйте /artists.")
+    key = STORE.index.resolve(arguments)
+    card = STORE.card(key) if key else None
+    if not card:
+        BOT.reply_to(message, _not_found(arguments, "Не нашёл такого исполнителя. Используйте /artists."))
         return
 
-    BOT.reply_to(message, _format_artist_card(artist))
+    BOT.reply_to(message, card)
 
 
 @BOT.message_handler(commands=["facts"])
@@ -180,17 +548,21 @@ def artist_facts(message: telebot.types.Message) -> None:
 
     artist = _resolve_artist(arguments)
     if not artist:
-        BOT.reply_to(message, "Имя не распознано. Посмотрите каталог через /artists.")
+        BOT.reply_to(message, _not_found(arguments, "Имя не распознано. Посмотрите каталог через /artists."))
         return
 
-    text = "\n".join(f"- {fact}" for fact in artist["facts"])
-    BOT.reply_to(message, f"Факты про {artist['name']}:\n{text}")
+    text = "\n".join(f"- {_html(fact)}" for fact in artist["facts"])
+    BOT.reply_to(message, f"Факты про {_html(artist['name'])}:\n{text}")
 
 
 @BOT.message_handler(commands=["random"])
 def random_artist(message: telebot.types.Message) -> None:
-    artist = random.choice(list(MUSIC_DB.values()))
-    BOT.reply_to(message, "Случайный выбор:\n" + _format_artist_card(artist))
+    keys = STORE.keys
+    card = STORE.card(random.choice(keys)) if keys else None
+    if not card:
+        BOT.reply_to(message, "Каталог пуст.")
+        return
+    BOT.reply_to(message, "Случайный выбор:\n" + card)
 
 
 @BOT.message_handler(func=lambda msg: True)
@@ -199,4 +571,5 @@ def fallback(message: telebot.types.Message) -> None:
 
 
 if __name__ == "__main__":
+    threading.Thread(target=_watch_db, name="db-watch", daemon=True).start()
     BOT.infinity_polling(timeout=60, long_polling_timeout=60)
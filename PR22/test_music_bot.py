@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Проверки бота-справочника (PR22): python -m pytest PR22
+
+Нужен установленный pyTelegramBotAPI; сеть не используется.
+"""
+from __future__ import annotations
+
+import importlib.util
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("telebot")
+
+
+def _load_main():
+    # main.py при импорте открывает базу и создаёт бота: база — во временном
+    # каталоге, токен — фиктивный (к Telegram тесты не обращаются).
+    os.environ["MUSIC_DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bot.sqlite3")
+    os.environ["TELEGRAM_TOKEN"] = "0:test"
+    spec = importlib.util.spec_from_file_location("pr22_main", Path(__file__).with_name("main.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+main = _load_main()
+
+
+def make_pr20_db(path: Path, rows) -> None:
+    """База в формате справочника PR20: только таблица entries."""
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executescript(main.ENTRIES_SCHEMA)
+        conn.executemany(
+            "INSERT INTO entries (artist, album, genre, year, rating, notes, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, '2024-01-01 00:00:00')",
+            rows,
+        )
+    conn.close()
+
+
+ROWS = [
+    ("Ария", "Герой асфальта", "Метал", 1987, 9, "Первый золотой диск"),
+    ("Ария", "Кровь за кровь", "Метал", 1991, 10, ""),
+    ("Ария", "Химера", "Хард-рок", 2001, None, ""),
+    ("Кино", "Группа крови", "Постпанк", 1988, 10, ""),
+]
+
+
+def test_index_resolves_aliases_and_suggests_typos():
+    index = main.ArtistIndex([
+        ("queen", "Queen", ["Фредди", "Freddie Mercury"]),
+        ("kino", "Кино", ["Виктор Цой", "цой"]),
+        ("pink", "Pink Floyd", []),
+    ])
+    assert index.resolve("  ФРЕДДИ ") == "queen"
+    assert index.resolve("виктор   цой") == "kino"
+    assert index.suggest("pink flod") == ["pink"]
+    assert index.suggest("цоой") == ["kino"]
+    assert index.suggest("совсем другое") == []
+
+
+def test_suggest_ranks_closest_first_and_respects_limit():
+    names = ["Metallica", "Metal Church", "Metallic Taste", "Megadeth", "Meat Loaf"]
+    index = main.ArtistIndex((name, name, []) for name in names)
+    assert index.suggest("metalica")[0] == "Metallica"
+    assert len(index.suggest("metal", limit=2)) == 2
+
+
+def test_paginate_respects_line_and_char_limits(monkeypatch):
+    monkeypatch.setattr(main, "PAGE_SIZE", 3)
+    monkeypatch.setattr(main, "PAGE_CHARS", 12)
+    assert main._paginate([], "\n") == ["-"]
+    assert main._paginate(["a", "b", "c", "d"], "\n") == ["a\nb\nc", "d"]
+    assert main._paginate(["aaaaa", "bbbbb", "ccccc"], ", ") == ["aaaaa, bbbbb", "ccccc"]
+
+
+def test_store_groups_pr20_entries_by_artist(tmp_path):
+    path = tmp_path / "catalog.db"
+    make_pr20_db(path, ROWS)
+    store = main.ArtistStore(path)
+    assert store.keys == ["Ария", "Кино"]
+    assert store.pages["genres"] == ["Метал, Постпанк, Хард-рок"]
+    artist = store.get("Ария")
+    assert artist["albums"] == ["Кровь за кровь (1991)", "Герой асфальта (1987)", "Химера (2001)"]
+    assert artist["genres"] == ["Метал", "Хард-рок"]
+    assert artist["facts"] == ["Первый золотой диск"]
+    assert "1987–2001" in artist["description"]
+    assert store.index.suggest("ариа") == ["Ария"]
+    # В чужую базу бот ничего не пишет.
+    tables = {name for (name,) in sqlite3.connect(path).execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {"entries"}
+
+
+def test_new_database_is_seeded_with_sample_artists(tmp_path):
+    store = main.ArtistStore(tmp_path / "new.db")
+    assert sorted(store.keys) == sorted(main.SAMPLE_ARTISTS)
+    key = store.index.resolve("цой")
+    assert key == "Кино (Виктор Цой)"
+    assert "Группа крови" in store.card(key)
+
+
+def test_store_reloads_after_foreign_commit_and_file_replacement(tmp_path):
+    path = tmp_path / "catalog.db"
+    make_pr20_db(path, ROWS[:1])
+    store = main.ArtistStore(path)
+    assert store.card("Ария") is not None
+    assert not store.refresh()
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "INSERT INTO entries (artist, album, genre, year, created_at) VALUES ('Кино', 'Кино', 'Рок', 1990, '')"
+        )
+    conn.close()
+    assert store.refresh()
+    assert store.keys == ["Ария", "Кино"]
+
+    replacement = tmp_path / "replacement.db"
+    make_pr20_db(replacement, [("Aquarium", "Radio Africa", "Рок", 1983, 8, "")])
+    os.replace(replacement, path)
+    assert store.refresh()
+    assert store.keys == ["Aquarium"]
+    assert store.card("Ария") is None
+
+
+def test_store_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ARTIST_CACHE_SIZE", 2)
+    path = tmp_path / "catalog.db"
+    make_pr20_db(path, [(f"Artist {i}", "Album", "Рок", 1990, None, "") for i in range(5)])
+    store = main.ArtistStore(path)
+    for key in store.keys:
+        store.card(key)
+    assert list(store._cache) == ["Artist 3", "Artist 4"]
+
+
+class NotModified(main.ApiTelegramException):
+    def __init__(self, message: str) -> None:
+        Exception.__init__(self, message)
+
+
+def test_turn_page_always_answers_the_callback(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.db"
+    make_pr20_db(path, [(f"Artist {i:03}", "Album", "Рок", 1990, None, "") for i in range(120)])
+    monkeypatch.setattr(main, "STORE", main.ArtistStore(path))
+    answered, edited = [], []
+
+    def edit(text, chat_id, message_id, reply_markup=None):
+        edited.append(text)
+        if len(edited) > 1:
+            raise NotModified("Bad Request: message is not modified")
+
+    monkeypatch.setattr(main.BOT, "edit_message_text", edit)
+    monkeypatch.setattr(main.BOT, "answer_callback_query", answered.append)
+    message = SimpleNamespace(chat=SimpleNamespace(id=1), message_id=2)
+    main.turn_page(SimpleNamespace(id="a", data="artists:99", message=message))
+    main.turn_page(SimpleNamespace(id="b", data="artists:99", message=message))
+    main.turn_page(SimpleNamespace(id="c", data="noop", message=message))
+    assert answered == ["a", "b", "c"]
+    assert "Artist 119" in edited[0]
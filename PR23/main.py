@@ -1,44 +1,722 @@
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy доступен только потоковый разбор
+    np = None
 
 INPUT_FILE = Path(r"numbers.txt")
+CHUNK_SIZE = 1 << 20
+BLOCK_SIZE = 1 << 24
+MIN_SHARD_SIZE = 1 << 22
+ENGINES = ("auto", "python", "numpy")
 
+# Кэш разобранных чисел: заголовок (сигнатура, количество чисел, размер и
+# mtime исходного файла, BLAKE2b его содержимого) и далее числа float64 LE.
+# Совпавшие размер и mtime — быстрый путь: кэш берётся без чтения исходника.
+# Содержимое сверяется по BLAKE2b, если mtime изменился (touch), или всегда
+# с --verify — на случай перезаписи того же размера в пределах тика mtime.
+CACHE_SUFFIX = ".f64cache"
+CACHE_MAGIC = b"PR23F64\x01"
+CACHE_HEADER = struct.Struct("<8sQQq32s")
+CACHE_BATCH = 1 << 16
 
-def load_numbers(path: Path) -> List[float]:
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+PROBE_SIZE = 4096
+WHITESPACE = (b" ", b"\t", b"\n", b"\r", b"\x0b", b"\x0c")
+
+# Частичный результат диапазона: (количество чисел, первое число,
+# сумма квадратов остальных чисел диапазона).
+Partial = Tuple[int, Optional[float], float]
+
+
+class BadToken(ValueError):
+    def __init__(self, token: bytes, position: int) -> None:
+        super().__init__(token, position)
+        self.token = token
+        self.position = position
+
+    def to_exit(self, offset: int = 0) -> SystemExit:
+        text = self.token.decode("utf-8", errors="replace")
+        return SystemExit(
+            f"Не удалось преобразовать '{text}' в число (позиция {offset + self.position})."
+        )
+
+
+def _open_input(path: Path) -> BinaryIO:
     try:
-        raw_content = path.read_text(encoding="utf-8")
+        return path.open("rb")
     except FileNotFoundError as exc:
         raise SystemExit(f"Не удалось открыть файл {path!s}: {exc}") from exc
 
-    tokens = raw_content.split()
-    if not tokens:
-        raise SystemExit("Файл не содержит данных для обработки.")
 
-    numbers: List[float] = []
-    for token in tokens:
-        normalized = token.replace(",", ".")
+def _stat_input(path: Path) -> os.stat_result:
+    try:
+        return path.stat()
+    except FileNotFoundError as exc:
+        raise SystemExit(f"Не удалось открыть файл {path!s}: {exc}") from exc
+
+
+def _iter_tokens(
+    handle: BinaryIO, chunk_size: int = CHUNK_SIZE, limit: Optional[int] = None
+) -> Iterator[bytes]:
+    # Хвост чанка без завершающего пробела может быть началом числа,
+    # поэтому он переносится в следующий чанк.
+    carry = b""
+    remaining = limit
+    while True:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        chunk = handle.read(size) if size else b""
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        data = carry + chunk
+        tokens = data.split()
+        if tokens and not data[-1:].isspace():
+            carry = tokens.pop()
+        else:
+            carry = b""
+        yield from tokens
+    if carry:
+        yield carry
+
+
+def _parse_token(token: bytes, position: int) -> float:
+    try:
+        return float(token.replace(b",", b"."))
+    except ValueError as exc:
+        raise BadToken(token, position) from exc
+
+
+def iter_numbers(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[float]:
+    with _open_input(path) as handle:
+        position = 0
         try:
-            numbers.append(float(normalized))
-        except ValueError as exc:
-            raise SystemExit(f"Не удалось преобразовать '{token}' в число.") from exc
-    return numbers
+            for position, token in enumerate(_iter_tokens(handle, chunk_size), start=1):
+                yield _parse_token(token, position)
+        except BadToken as exc:
+            raise exc.to_exit() from None
+    if position == 0:
+        raise SystemExit("Файл не содержит данных для обработки.")
+
+
+def load_numbers(path: Path) -> List[float]:
+    return list(iter_numbers(path))
 
 
-def difference_of_squares(numbers: List[float]) -> float:
-    if len(numbers) < 2:
+def difference_of_squares(numbers: Iterable[float]) -> float:
+    iterator = iter(numbers)
+    first = next(iterator, None)
+    if first is None:
         raise SystemExit("Недостаточно чисел: требуется минимум два.")
-    
-    result = numbers[0] ** 2
-    for i in range(1, len(numbers)):
-        result -= numbers[i] ** 2
-        
+
+    result = first ** 2
+    count = 1
+    for number in iterator:
+        result -= number ** 2
+        count += 1
+
+    if count < 2:
+        raise SystemExit("Недостаточно чисел: требуется минимум два.")
+    return result
+
+
+def _compensated_add(total: float, compensation: float, value: float) -> Tuple[float, float]:
+    # Суммирование Кахана–Ноймайера: потерянные младшие разряды копятся отдельно.
+    new_total = total + value
+    if abs(total) >= abs(value):
+        compensation += (total - new_total) + value
+    else:
+        compensation += (value - new_total) + total
+    return new_total, compensation
+
+
+def _aligned_end(buffer: mmap.mmap, position: int, size: int) -> int:
+    while position < size and not buffer[position:position + 1].isspace():
+        position += 1
+    return position
+
+
+def _parse_block(raw: bytes, offset: int) -> "np.ndarray":
+    tokens = raw.replace(b",", b".").split()
+    if not tokens:
+        return np.empty(0, dtype=np.float64)
+    try:
+        return np.array(tokens).astype(np.float64)
+    except ValueError:
+        # Медленный путь: найти плохой токен с его позицией или разобрать
+        # то, что float() понимает, а NumPy нет (например, "1_000").
+        for position, token in enumerate(raw.split(), start=offset + 1):
+            _parse_token(token, position)
+        return np.fromiter((float(token) for token in tokens), dtype=np.float64, count=len(tokens))
+
+
+def _reduce_numpy(
+    buffer: mmap.mmap,
+    start: int,
+    end: int,
+    block_size: int = BLOCK_SIZE,
+    sink: Optional[Callable[["np.ndarray"], None]] = None,
+) -> Partial:
+    first: Optional[float] = None
+    count = 0
+    total, compensation = 0.0, 0.0
+    while start < end:
+        stop = _aligned_end(buffer, min(start + block_size, end), end)
+        block = _parse_block(buffer[start:stop], count)
+        start = stop
+        if not block.size:
+            continue
+        count += block.size
+        if sink is not None:
+            sink(block)
+        if first is None:
+            first = float(block[0])
+            block = block[1:]
+        # np.sum суммирует попарно, между блоками — компенсированно.
+        total, compensation = _compensated_add(total, compensation, float(np.square(block).sum()))
+    return count, first, total + compensation
+
+
+def _reduce_python(handle: BinaryIO, start: int, end: int) -> Partial:
+    handle.seek(start)
+    first: Optional[float] = None
+    count = 0
+    total = 0.0
+    for count, token in enumerate(_iter_tokens(handle, CHUNK_SIZE, end - start), start=1):
+        value = _parse_token(token, count)
+        if first is None:
+            first = value
+        else:
+            total += value ** 2
+    return count, first, total
+
+
+def _reduce_range(path: str, start: int, end: int, use_numpy: bool) -> Partial:
+    with open(path, "rb") as handle:
+        if not use_numpy:
+            return _reduce_python(handle, start, end)
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _reduce_numpy(buffer, start, end)
+
+
+def _merge(left: Partial, right: Partial) -> Partial:
+    count, first, total = left
+    right_count, right_first, right_total = right
+    if not right_count:
+        return left
+    if first is None:
+        return count + right_count, right_first, total + right_total
+    return count + right_count, first, total + right_first ** 2 + right_total
+
+
+def _finish(count: int, first: Optional[float], total: float) -> float:
+    if first is None:
+        raise SystemExit("Файл не содержит данных для обработки.")
+    if count < 2:
+        raise SystemExit("Недостаточно чисел: требуется минимум два.")
+    return first ** 2 - total
+
+
+def difference_of_squares_numpy(
+    path: Path,
+    block_size: int = BLOCK_SIZE,
+    sink: Optional[Callable[["np.ndarray"], None]] = None,
+) -> float:
+    with _open_input(path) as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            raise SystemExit("Файл не содержит данных для обработки.")
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            try:
+                partial = _reduce_numpy(buffer, 0, size, block_size, sink)
+            except BadToken as exc:
+                raise exc.to_exit() from None
+    return _finish(*partial)
+
+
+def shard_bounds(path: Path, workers: int, min_size: int = MIN_SHARD_SIZE) -> List[Tuple[int, int]]:
+    with _open_input(path) as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return []
+        shards = max(1, min(workers, size // min_size))
+        bounds = [0]
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for index in range(1, shards):
+                # Граница сдвигается до пробела: число целиком достаётся
+                # предыдущему диапазону.
+                bounds.append(max(bounds[-1], _aligned_end(buffer, size * index // shards, size)))
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def difference_of_squares_sharded(path: Path, workers: int, use_numpy: bool = False) -> float:
+    """Параллельный подсчёт по диапазонам файла.
+
+    Суммы квадратов складываются в другом порядке, чем в последовательном
+    проходе, поэтому результаты совпадают с точностью до n·2⁻⁵³·Σx²
+    (n — количество чисел), а не побитово.
+    """
+    bounds = shard_bounds(path, workers)
+    if not bounds:
+        raise SystemExit("Файл не содержит данных для обработки.")
+    if len(bounds) == 1:
+        # Файл меньше двух диапазонов по MIN_SHARD_SIZE: параллелить нечего,
+        # а запуск пула процессов дороже самого разбора.
+        return difference_of_squares_numpy(path) if use_numpy else difference_of_squares(iter_numbers(path))
+
+    count = 0
+    first: Optional[float] = None
+    parts: List[float] = []
+    with ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+        futures = [pool.submit(_reduce_range, str(path), start, end, use_numpy) for start, end in bounds]
+        for future in futures:
+            try:
+                shard_count, shard_first, shard_total = future.result()
+            except BadToken as exc:
+                for pending in futures:
+                    pending.cancel()
+                raise exc.to_exit(count) from None
+            if not shard_count:
+                continue
+            if first is None:
+                first = shard_first
+            else:
+                # Первое число остальных диапазонов вычитается как обычное.
+                parts.append(shard_first ** 2)
+            parts.append(shard_total)
+            count += shard_count
+    return _finish(count, first, math.fsum(parts))
+
+
+def cache_path(path: Path) -> Path:
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def _file_digest(path: Path) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class CacheWriter:
+    def __init__(self, path: Path, stat: os.stat_result) -> None:
+        self.source = path
+        self.stat = stat
+        self.target = cache_path(path)
+        self.temp = self.target.with_name(self.target.name + ".tmp")
+        self.handle = self.temp.open("wb")
+        self.handle.write(bytes(CACHE_HEADER.size))
+        self.count = 0
+        self.pending = array("d")
+
+    def add(self, value: float) -> None:
+        self.pending.append(value)
+        if len(self.pending) >= CACHE_BATCH:
+            self._flush()
+
+    def add_block(self, block: "np.ndarray") -> None:
+        self._flush()
+        self.handle.write(np.ascontiguousarray(block, dtype="<f8").data)
+        self.count += block.size
+
+    def tee(self, numbers: Iterable[float]) -> Iterator[float]:
+        for number in numbers:
+            self.add(number)
+            yield number
+
+    def _flush(self) -> None:
+        if sys.byteorder != "little":
+            self.pending.byteswap()
+        self.pending.tofile(self.handle)
+        self.count += len(self.pending)
+        self.pending = array("d")
+
+    def commit(self) -> None:
+        self._flush()
+        stat = self.source.stat()
+        if (stat.st_size, stat.st_mtime_ns) != (self.stat.st_size, self.stat.st_mtime_ns):
+            # Файл изменился во время разбора — такой кэш сразу устареет.
+            self.discard()
+            return
+        header = CACHE_HEADER.pack(
+            CACHE_MAGIC, self.count, stat.st_size, stat.st_mtime_ns, _file_digest(self.source)
+        )
+        self.handle.seek(0)
+        self.handle.write(header)
+        self.handle.close()
+        os.replace(self.temp, self.target)
+
+    def discard(self) -> None:
+        self.handle.close()
+        self.temp.unlink(missing_ok=True)
+
+
+def _reduce_cached(buffer: mmap.mmap, count: int) -> Partial:
+    if np is not None:
+        values = np.frombuffer(buffer, dtype="<f8", count=count, offset=CACHE_HEADER.size)
+        partial = (count, float(values[0]), float(np.square(values[1:]).sum()))
+        del values  # mmap нельзя закрыть, пока на него есть ссылки
+        return partial
+
+    if sys.byteorder == "little":
+        with memoryview(buffer) as raw, raw[CACHE_HEADER.size:].cast("d") as values:
+            return count, values[0], sum(value ** 2 for value in values[1:])
+    values = array("d", buffer[CACHE_HEADER.size:])
+    values.byteswap()
+    return count, values[0], sum(value ** 2 for value in values[1:])
+
+
+def load_cached(path: Path, verify: bool = False) -> Optional[Partial]:
+    try:
+        stat = path.stat()
+        handle = cache_path(path).open("rb")
+    except OSError:
+        return None
+
+    with handle:
+        header = handle.read(CACHE_HEADER.size)
+        if len(header) != CACHE_HEADER.size:
+            return None
+        magic, count, size, mtime_ns, digest = CACHE_HEADER.unpack(header)
+        if magic != CACHE_MAGIC or size != stat.st_size or count == 0:
+            return None
+        if os.fstat(handle.fileno()).st_size != CACHE_HEADER.size + 8 * count:
+            return None
+        if (verify or mtime_ns != stat.st_mtime_ns) and digest != _file_digest(path):
+            return None
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _reduce_cached(buffer, count)
+
+
+def _compute_cached(path: Path, use_numpy: bool, verify: bool = False) -> float:
+    cached = load_cached(path, verify)
+    if cached is not None:
+        return _finish(*cached)
+
+    writer = CacheWriter(path, _stat_input(path))
+    try:
+        if use_numpy:
+            result = difference_of_squares_numpy(path, sink=writer.add_block)
+        else:
+            result = difference_of_squares(writer.tee(iter_numbers(path)))
+    except BaseException:
+        writer.discard()
+        raise
+    writer.commit()
     return result
 
 
-def main() -> None:
-    numbers = load_numbers(INPUT_FILE)
-    result = difference_of_squares(numbers)
-    print(result)
+@dataclass
+class Checkpoint:
+    offset: int = 0
+    count: int = 0
+    first: Optional[float] = None
+    total: float = 0.0
+    head: str = ""
+    tail: str = ""
+    device: int = 0
+    inode: int = 0
+    # BLAKE2b всего разобранного префикса [0, offset) — только в режиме --verify;
+    # пустая строка, если контрольная точка записана без него.
+    digest: str = ""
+    # Хэш префикса, уже сверенный в этом процессе; дописанные байты лишь
+    # добавляются к нему, так что при --follow префикс не перечитывается.
+    hasher: Optional["hashlib._Hash"] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def partial(self) -> Partial:
+        return self.count, self.first, self.total
+
+
+def checkpoint_path(path: Path) -> Path:
+    return path.with_name(path.name + CHECKPOINT_SUFFIX)
+
+
+def load_checkpoint(path: Path) -> Optional[Checkpoint]:
+    try:
+        raw = json.loads(checkpoint_path(path).read_text(encoding="utf-8"))
+        return Checkpoint(**raw)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_checkpoint(path: Path, checkpoint: Checkpoint) -> None:
+    target = checkpoint_path(path)
+    temp = target.with_name(target.name + ".tmp")
+    state = {item.name: getattr(checkpoint, item.name) for item in fields(checkpoint) if item.init}
+    temp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(temp, target)
+
+
+def _probe(handle: BinaryIO, offset: int) -> Tuple[str, str]:
+    # Отпечатки начала файла и участка перед offset: если они не совпали,
+    # файл переписан, а не дописан.
+    handle.seek(0)
+    head = handle.read(min(offset, PROBE_SIZE))
+    start = max(0, offset - PROBE_SIZE)
+    handle.seek(start)
+    tail = handle.read(offset - start)
+    return (
+        hashlib.blake2b(head, digest_size=16).hexdigest(),
+        hashlib.blake2b(tail, digest_size=16).hexdigest(),
+    )
+
+
+def _prefix_hasher(handle: BinaryIO, start: int, end: int, hasher: Optional["hashlib._Hash"] = None) -> "hashlib._Hash":
+    hasher = hashlib.blake2b(digest_size=32) if hasher is None else hasher.copy()
+    handle.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = handle.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        remaining -= len(chunk)
+    return hasher
+
+
+def _same_prefix(handle: BinaryIO, stat: os.stat_result, checkpoint: Checkpoint, verify: bool) -> bool:
+    # По умолчанию проверки ограничены по объёму: тот же inode, файл не
+    # усечён, совпали отпечатки начала и участка перед offset. Полный хэш
+    # префикса (--verify) читает весь уже разобранный файл — один раз за процесс.
+    if (checkpoint.device, checkpoint.inode) != (stat.st_dev, stat.st_ino) or checkpoint.offset > stat.st_size:
+        return False
+    if _probe(handle, checkpoint.offset) != (checkpoint.head, checkpoint.tail):
+        return False
+    if verify and checkpoint.hasher is None:
+        if not checkpoint.digest:
+            return False  # точка записана без --verify — сверить не с чем
+        hasher = _prefix_hasher(handle, 0, checkpoint.offset)
+        if hasher.hexdigest() != checkpoint.digest:
+            return False
+        checkpoint.hasher = hasher
+    return True
+
+
+def _last_boundary(handle: BinaryIO, start: int, end: int) -> int:
+    # Позиция сразу за последним пробельным символом в [start, end):
+    # всё, что после неё, может быть ещё не дописанным числом.
+    position = end
+    while position > start:
+        step = min(CHUNK_SIZE, position - start)
+        handle.seek(position - step)
+        data = handle.read(step)
+        index = max(data.rfind(byte) for byte in WHITESPACE)
+        if index >= 0:
+            return position - step + index + 1
+        position -= step
+    return start
+
+
+def advance(
+    path: Path, checkpoint: Optional[Checkpoint], use_numpy: bool = False, verify: bool = False
+) -> Tuple[Checkpoint, bytes, bool]:
+    """Дочитывает файл от контрольной точки.
+
+    Возвращает новую контрольную точку, недописанный хвост файла и признак
+    того, что файл был усечён или переписан и подсчёт начат заново.
+    С verify префикс до контрольной точки сверяется по полному хэшу.
+    """
+    with _open_input(path) as handle:
+        stat = os.fstat(handle.fileno())
+        size = stat.st_size
+        rebuilt = False
+        if checkpoint is None or not _same_prefix(handle, stat, checkpoint, verify):
+            rebuilt = checkpoint is not None
+            checkpoint = Checkpoint(device=stat.st_dev, inode=stat.st_ino)
+            checkpoint.head, checkpoint.tail = _probe(handle, 0)
+            if verify:
+                checkpoint.hasher = hashlib.blake2b(digest_size=32)
+                checkpoint.digest = checkpoint.hasher.hexdigest()
+
+        boundary = _last_boundary(handle, checkpoint.offset, size)
+        if boundary > checkpoint.offset:
+            try:
+                appended = _reduce_range(str(path), checkpoint.offset, boundary, use_numpy)
+            except BadToken as exc:
+                raise exc.to_exit(checkpoint.count) from None
+            count, first, total = _merge(checkpoint.partial, appended)
+            head, tail = _probe(handle, boundary)
+            # Хэш продолжается, только если префикс уже сверен; без --verify
+            # поле digest очищается — продолжить его можно лишь перечитав префикс.
+            hasher = None
+            if checkpoint.hasher is not None:
+                hasher = _prefix_hasher(handle, checkpoint.offset, boundary, checkpoint.hasher)
+            checkpoint = Checkpoint(
+                boundary, count, first, total, head, tail, stat.st_dev, stat.st_ino,
+                hasher.hexdigest() if hasher is not None else "",
+            )
+            checkpoint.hasher = hasher
+
+        handle.seek(boundary)
+        pending = handle.read(size - boundary)
+    return checkpoint, pending, rebuilt
+
+
+def _with_pending(checkpoint: Checkpoint, pending: bytes) -> Partial:
+    # Последнее число без пробела после него считается, только когда файл
+    # уже дописан: при разовом подсчёте или при выходе из --follow.
+    token = pending.strip()
+    if not token:
+        return checkpoint.partial
+    try:
+        value = _parse_token(token, checkpoint.count + 1)
+    except BadToken as exc:
+        raise exc.to_exit() from None
+    return _merge(checkpoint.partial, (1, value, 0.0))
+
+
+def compute_incremental(path: Path, use_numpy: bool = False, verify: bool = False) -> float:
+    saved = load_checkpoint(path)
+    checkpoint, pending, rebuilt = advance(path, saved, use_numpy, verify)
+    if rebuilt:
+        print("Файл усечён или переписан — выполнен полный пересчёт.", file=sys.stderr)
+    if checkpoint != saved:
+        save_checkpoint(path, checkpoint)
+    return _finish(*_with_pending(checkpoint, pending))
+
+
+def follow(path: Path, use_numpy: bool = False, interval: float = 1.0, verify: bool = False) -> None:
+    """Печатает результат при каждом дописывании файла.
+
+    Хвост без завершающего пробела может быть недописанным числом («3» из
+    будущего «31»), поэтому в промежуточные результаты он не входит.
+    После Ctrl+C файл считается дописанным: хвост учитывается в последнем,
+    строгом подсчёте.
+    """
+    checkpoint = saved = load_checkpoint(path)
+    pending = b""
+    last: Optional[float] = None
+
+    def report(partial: Partial) -> None:
+        nonlocal last
+        if partial[0] >= 2:
+            result = _finish(*partial)
+            if result != last:
+                print(result, flush=True)
+                last = result
+
+    try:
+        while True:
+            checkpoint, pending, rebuilt = advance(path, checkpoint, use_numpy, verify)
+            if rebuilt:
+                print("Файл усечён или переписан — выполнен полный пересчёт.", file=sys.stderr)
+            if checkpoint != saved:  # пока файл не дописывают, диск не трогаем
+                save_checkpoint(path, checkpoint)
+                saved = checkpoint
+            report(checkpoint.partial)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        if checkpoint is not None:
+            report(_with_pending(checkpoint, pending))
+
+
+def _use_numpy(engine: str) -> bool:
+    if engine == "numpy" and np is None:
+        print("NumPy не установлен, используется потоковый разбор.", file=sys.stderr)
+    return engine in ("auto", "numpy") and np is not None
+
+
+def compute(
+    path: Path,
+    engine: str = "python",
+    workers: int = 1,
+    cache: bool = False,
+    incremental: bool = False,
+    verify: bool = False,
+) -> float:
+    if workers > 1 and (cache or incremental):
+        raise SystemExit("Параллельный разбор несовместим с кэшем и инкрементальным режимом.")
+    use_numpy = _use_numpy(engine)
+    if incremental:
+        return compute_incremental(path, use_numpy, verify)
+    if cache:
+        return _compute_cached(path, use_numpy, verify)
+    if workers > 1:
+        return difference_of_squares_sharded(path, workers, use_numpy)
+    if use_numpy:
+        return difference_of_squares_numpy(path)
+    return difference_of_squares(iter_numbers(path))
+
+
+def _workers(text: str) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидалось целое число, получено {text!r}") from None
+    if value < 0:
+        raise argparse.ArgumentTypeError("число процессов не может быть отрицательным (0 — по числу ядер)")
+    return value
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Разность квадратов чисел из файла.")
+    parser.add_argument("path", nargs="?", type=Path, default=INPUT_FILE)
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="python",
+        help="python — последовательный разбор, как в исходной программе; numpy (или auto — "
+        "numpy, если установлен) быстрее, но суммирует попарно, и последние знаки "
+        "результата могут отличаться",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_workers,
+        default=1,
+        help="число процессов для больших файлов (0 — по числу ядер); "
+        "не сочетается с --cache, --incremental и --follow",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"хранить разобранные числа рядом с файлом (*{CACHE_SUFFIX}) и читать их повторно",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"разбирать только дописанный хвост, запоминая прогресс в *{CHECKPOINT_SUFFIX}",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="следить за дописыванием файла и печатать обновлённый результат",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="сверять содержимое по хэшу: для --cache — исходный файл даже при тех же размере "
+        "и mtime, для --incremental и --follow — весь уже разобранный префикс "
+        "(читает его целиком; точка, записанная без --verify, пересчитывается)",
+    )
+    parser.add_argument("--interval", type=float, default=1.0, help="период опроса для --follow, с")
+    args = parser.parse_args(argv)
+    if args.workers != 1 and (args.cache or args.incremental or args.follow):
+        parser.error("--workers нельзя сочетать с --cache, --incremental и --follow")
+
+    if args.follow:
+        follow(args.path, _use_numpy(args.engine), args.interval, args.verify)
+        return
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    print(compute(args.path, args.engine, workers, args.cache, args.incremental, args.verify))
 
 
 if __name__ == "__main__":
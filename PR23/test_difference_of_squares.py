@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Проверки разности квадратов (PR23): python -m pytest PR23"""
+from __future__ import annotations
+
+import importlib.util
+import math
+import os
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def _load_main():
+    # main.py есть в каждой практической, поэтому модуль грузится по пути
+    # под собственным именем, а не через import main.
+    spec = importlib.util.spec_from_file_location("pr23_main", Path(__file__).with_name("main.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+main = _load_main()
+
+
+def write_numbers(path: Path, numbers, rnd: random.Random) -> None:
+    # Вперемешку пробелы, табуляции, переводы строк и десятичные запятые.
+    parts = []
+    for number in numbers:
+        text = repr(number)
+        parts.append(text.replace(".", ",") if rnd.random() < 0.3 else text)
+        parts.append(rnd.choice([" ", "\n", "\t", "  \r\n"]))
+    path.write_text("".join(parts), encoding="utf-8")
+
+
+@pytest.fixture
+def sample(tmp_path):
+    rnd = random.Random(11)
+    numbers = [rnd.uniform(-1000, 1000) for _ in range(5000)] + [3, -7, 0.5]
+    path = tmp_path / "numbers.txt"
+    write_numbers(path, numbers, rnd)
+    return path, numbers[0] ** 2 - math.fsum(x ** 2 for x in numbers[1:])
+
+
+def close(a: float, b: float) -> bool:
+    return math.isclose(a, b, rel_tol=1e-12)
+
+
+def test_streaming_reader_handles_tokens_split_across_chunks(sample):
+    path, _ = sample
+    expected = main.load_numbers(path)
+    for chunk_size in (1, 2, 3, 7, 64):
+        assert list(main.iter_numbers(path, chunk_size)) == expected
+
+
+def test_engines_agree(sample, monkeypatch):
+    path, expected = sample
+    sequential = main.compute(path)
+    assert close(sequential, expected)
+    # Маленькие диапазоны, чтобы и небольшой файл делился на несколько.
+    bounds = main.shard_bounds
+    monkeypatch.setattr(main, "shard_bounds", lambda p, workers: bounds(p, workers, min_size=1024))
+    assert len(main.shard_bounds(path, 4)) == 4
+    assert close(main.compute(path, workers=4), expected)
+    if main.np is not None:
+        assert close(main.compute(path, engine="numpy"), expected)
+        assert close(main.difference_of_squares_numpy(path, block_size=1000), expected)
+        assert close(main.compute(path, engine="numpy", workers=4), expected)
+
+
+def test_small_file_skips_the_process_pool(sample, monkeypatch):
+    path, _ = sample
+    monkeypatch.setattr(main, "ProcessPoolExecutor", None)  # пул создать нельзя
+    assert main.compute(path, workers=4) == main.compute(path)
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("", "не содержит данных"),
+        ("  \n ", "не содержит данных"),
+        ("5", "минимум два"),
+        ("1 2 x3 4", "'x3' в число (позиция 3)"),
+    ],
+)
+def test_user_errors(tmp_path, text, message):
+    path = tmp_path / "numbers.txt"
+    path.write_text(text, encoding="utf-8")
+    engines = ["python"] + (["numpy"] if main.np is not None else [])
+    for engine in engines:
+        for kwargs in ({}, {"cache": True}, {"incremental": True}):
+            with pytest.raises(SystemExit, match=re.escape(message)):
+                main.compute(path, engine, **kwargs)
+
+
+def test_cache_hit_and_invalidation(tmp_path):
+    path = tmp_path / "numbers.txt"
+    path.write_text("1 2 3 4\n", encoding="utf-8")
+    assert main.compute(path, cache=True) == -28
+    assert main.cache_path(path).exists()
+    assert main.load_cached(path) == (4, 1.0, 29.0)
+
+    stat = path.stat()
+    path.write_text("1 2 3 5\n", encoding="utf-8")  # тот же размер и тот же mtime
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert main.compute(path, cache=True, verify=True) == -37
+
+    path.write_text("2 2 3 5 7\n", encoding="utf-8")  # другой размер
+    assert main.compute(path, cache=True) == -83
+    os.utime(path)  # touch без правки: содержимое сверяется по хэшу
+    assert main.load_cached(path) == (5, 2.0, 87.0)
+
+
+def test_incremental_reads_only_the_appended_tail(tmp_path, monkeypatch):
+    path = tmp_path / "numbers.txt"
+    path.write_text("10 2 3 ", encoding="utf-8")
+    assert main.compute(path, incremental=True) == 87
+
+    reduced = []
+    reduce_range = main._reduce_range
+    monkeypatch.setattr(main, "_reduce_range", lambda *args: reduced.append(args[1:3]) or reduce_range(*args))
+    with path.open("a", encoding="utf-8") as f:
+        f.write("4 5")  # «5» ещё может дописываться
+    assert main.compute(path, incremental=True) == 87 - 16 - 25
+    assert reduced == [(7, 9)]
+    assert main.load_checkpoint(path).offset == 9
+
+
+def test_incremental_restarts_after_rewrite(tmp_path, capsys):
+    path = tmp_path / "numbers.txt"
+    path.write_text("10 2 3 4 ", encoding="utf-8")
+    assert main.compute(path, incremental=True) == 71
+    path.write_text("10 2 ", encoding="utf-8")  # усечён
+    assert main.compute(path, incremental=True) == 96
+    replacement = tmp_path / "replacement.txt"
+    replacement.write_text("10 1 ", encoding="utf-8")  # тот же размер, новый файл
+    os.replace(replacement, path)
+    assert main.compute(path, incremental=True) == 99
+    assert capsys.readouterr().err.count("полный пересчёт") == 2
+
+
+def test_verify_detects_a_same_size_rewrite_in_the_middle(tmp_path):
+    path = tmp_path / "numbers.txt"
+    body = " ".join(str(i) for i in range(1, 3000)) + " "
+    path.write_text(body, encoding="utf-8")
+    main.compute(path, incremental=True, verify=True)
+    middle = body.index(" 1500 ")
+    with path.open("r+b") as f:
+        f.seek(middle + 1)
+        f.write(b"2")
+    expected = main.difference_of_squares(main.iter_numbers(path))
+    assert main.compute(path, incremental=True, verify=True) == expected
+
+
+def test_workers_are_validated():
+    with pytest.raises(SystemExit):
+        main.main(["--workers", "-3"])
+    with pytest.raises(SystemExit):
+        main.main(["--workers", "2", "--cache"])